@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# Notify the bot processes of changes to the spawn configuration of guilds, to keep their
+# caches in sync without reloading everything (see ballsdex/packages/countryballs/sync.py)
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION notify_guildconfig_change() RETURNS trigger AS $$
+DECLARE
+    rec guildconfig;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := OLD;
+    ELSE
+        rec := NEW;
+    END IF;
+    PERFORM pg_notify(
+        'guildconfig_changes',
+        json_build_object(
+            'op', TG_OP,
+            'guild_id', rec.guild_id,
+            'spawn_channel', rec.spawn_channel,
+            'enabled', rec.enabled
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER guildconfig_notify
+AFTER INSERT OR DELETE OR UPDATE OF guild_id, spawn_channel, enabled ON guildconfig
+FOR EACH ROW EXECUTE FUNCTION notify_guildconfig_change();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS guildconfig_notify ON guildconfig;
+DROP FUNCTION IF EXISTS notify_guildconfig_change();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bd_models", "0012_alter_ball_options_alter_ballinstance_options_and_more"),
+    ]
+
+    operations = [migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER)]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bd_models", "0013_guildconfig_notify"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ballinstance",
+            name="spawn_id",
+            field=models.BigIntegerField(
+                blank=True,
+                help_text="Discord message ID of the spawn this ball was caught from",
+                null=True,
+                unique=True,
+            ),
+        ),
+    ]
@@ -349,6 +349,12 @@ class BallInstance(models.Model):
         blank=True, null=True, help_text="If the instance was locked for a trade and when"
     )
     spawned_time = models.DateTimeField(blank=True, null=True)
+    spawn_id = models.BigIntegerField(
+        blank=True,
+        null=True,
+        unique=True,
+        help_text="Discord message ID of the spawn this ball was caught from",
+    )
 
     def __str__(self) -> str:
         text = ""
@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import time
+from io import BytesIO
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from tortoise.expressions import Q
+from tortoise.timezone import now as tortoise_now
+
+from ballsdex.core.image_generator.image_gen import (
+    CardEncoding,
+    CardSpec,
+    asset_cache,
+    card_cache_key,
+    get_static_layer,
+    render_card,
+    static_layer_key,
+)
+from ballsdex.core.image_generator.render_cache import RenderCache
+from ballsdex.core.models import Ball, BallInstance, Special
+from ballsdex.settings import settings
+
+from ...utils import refresh_cache
+
+MEDIA_PATH = "./media/"
+
+# state of a worker process, set by the initializer
+_cache: RenderCache | None = None
+
+
+def _init_worker(cache_path: Path, cache_max_size: int, asset_cache_size: int):
+    global _cache
+    _cache = RenderCache(cache_path, cache_max_size)
+    asset_cache.resize(asset_cache_size)
+
+
+def _prewarm(job: tuple[str, CardSpec, list[CardEncoding]]) -> str:
+    """
+    Store the static layer of a card in the render cache, then the full cards for each
+    encoding if they are missing. Returns the ID of the job.
+    """
+    job_id, card, encodings = job
+    assert _cache is not None
+    get_static_layer(card, MEDIA_PATH, _cache)
+    for encoding in encodings:
+        key = card_cache_key(card, MEDIA_PATH, encoding)
+        if file := _cache.open(key):
+            file.close()
+            continue
+        image, kwargs = render_card(card, MEDIA_PATH, encoding, _cache)
+        buffer = BytesIO()
+        image.save(buffer, **kwargs)
+        image.close()
+        _cache.put(key, buffer.getvalue())
+    return job_id
+
+
+def _cached_size(cache: RenderCache, key: str) -> int | None:
+    """
+    Return the size of a file of the render cache, or `None` if it is missing (never written,
+    or evicted since).
+    """
+    if not (file := cache.open(key)):
+        return None
+    with file:
+        return os.fstat(file.fileno()).st_size
+
+
+class Command(BaseCommand):
+    help = (
+        "Render ahead of time the cards of every enabled countryball with every active or "
+        "upcoming special, to fill the render cache before an event starts. The regime "
+        "backgrounds are included too. Interrupted runs are resumed unless --restart is passed."
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Also render the full cards without stat bonuses, not only the static layers.",
+        )
+        parser.add_argument(
+            "--thumbnails",
+            action="store_true",
+            help="With --full, also render the thumbnails shown when browsing collections.",
+        )
+        parser.add_argument(
+            "--special",
+            help="Only prewarm this special event. Regime backgrounds are skipped.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of rendering processes, defaults to the number of CPUs.",
+        )
+        parser.add_argument(
+            "--state-file",
+            type=Path,
+            help="File recording completed renders, defaults to .prewarm-state in the cache.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the progress of a previous run.",
+        )
+
+    async def list_cards(self, special_name: str | None) -> list[tuple[str, CardSpec]]:
+        await refresh_cache()
+
+        if special_name:
+            special_list = await Special.filter(name__iexact=special_name)
+            if not special_list:
+                raise CommandError(f'No special found with the name "{special_name}"')
+        else:
+            # specials with a start date in the future are included, to prepare events
+            special_list = [None] + await Special.filter(
+                Q(end_date__isnull=True) | Q(end_date__gte=tortoise_now())
+            )
+
+        cards: list[tuple[str, CardSpec]] = []
+        for ball in await Ball.filter(enabled=True):
+            for special in special_list:
+                instance = BallInstance(ball=ball, special=special)
+                name = ball.country + (f" ({special.name})" if special else "")
+                cards.append((name, CardSpec.from_instance(instance)))
+        return cards
+
+    def check_budget(self, cache: RenderCache, outputs: list[str], total: int):
+        """
+        Warn if the outputs of all the cards, estimated from the ones of a single card, do not
+        fit in the render cache. The run would then evict its own earlier renders.
+        """
+        size = sum(_cached_size(cache, key) or 0 for key in outputs)
+        estimate = size * total
+        if estimate > cache.max_size:
+            self.stderr.write(
+                self.style.WARNING(
+                    f"The {total} cards need about {estimate // 1024 // 1024}MB but the render "
+                    f"cache is limited to {cache.max_size // 1024 // 1024}MB, the first ones "
+                    "will be evicted before the end. Raise render.cache-max-size in config.yml "
+                    "or prewarm a single special with --special."
+                )
+            )
+
+    def handle(self, *args, **options):
+        if not settings.render_cache_path:
+            raise CommandError("The render cache is disabled in config.yml.")
+        # the admin panel runs from its own directory, next to config.yml
+        cache_path = Path("..", settings.render_cache_path)
+        state_path: Path = options["state_file"] or cache_path / ".prewarm-state"
+
+        encodings: list[CardEncoding] = []
+        if options["full"]:
+            encodings.append(CardEncoding.from_settings())
+            if options["thumbnails"]:
+                encodings.append(CardEncoding.from_settings(thumbnail=True))
+
+        loop = asyncio.get_event_loop()
+        cards = loop.run_until_complete(self.list_cards(options["special"]))
+
+        # jobs are identified by the hash of their outputs, so editing an asset or changing
+        # the encoding settings renders the affected cards again on resume
+        jobs: dict[str, tuple[str, CardSpec, list[CardEncoding]]] = {}
+        job_outputs: dict[str, list[str]] = {}
+        names: dict[str, str] = {}
+        for name, card in cards:
+            outputs = [static_layer_key(card, MEDIA_PATH)] + [
+                card_cache_key(card, MEDIA_PATH, x) for x in encodings
+            ]
+            job_id = hashlib.sha256(" ".join(outputs).encode()).hexdigest()
+            jobs[job_id] = (job_id, card, encodings)
+            job_outputs[job_id] = outputs
+            names[job_id] = name
+
+        cache = RenderCache(cache_path, settings.render_cache_max_size * 1024 * 1024)
+        if options["restart"]:
+            state_path.unlink(missing_ok=True)
+        done: set[str] = set()
+        if state_path.exists():
+            done = set(state_path.read_text().split())
+        # outputs of a previous run may have been evicted since, render them again
+        done = {
+            job_id
+            for job_id in done & jobs.keys()
+            if all(_cached_size(cache, key) is not None for key in job_outputs[job_id])
+        }
+        pending = [job for job_id, job in jobs.items() if job_id not in done]
+        skipped = len(jobs) - len(pending)
+        if skipped:
+            self.stdout.write(f"Resuming, {skipped}/{len(jobs)} cards were already prewarmed.")
+        if not pending:
+            self.stdout.write(self.style.SUCCESS("Nothing to do."))
+            return
+
+        workers = max(1, min(options["workers"], len(pending)))
+        self.stdout.write(f"Prewarming {len(pending)} cards with {workers} processes...")
+        start = time.perf_counter()
+        context = multiprocessing.get_context("spawn")
+        with (
+            context.Pool(
+                workers,
+                initializer=_init_worker,
+                initargs=(
+                    cache_path,
+                    cache.max_size,
+                    settings.render_asset_cache_size * 1024 * 1024,
+                ),
+            ) as pool,
+            state_path.open("a") as state,
+        ):
+            for i, job_id in enumerate(pool.imap_unordered(_prewarm, pending), start=1):
+                state.write(job_id + "\n")
+                state.flush()
+                if i == 1:
+                    self.check_budget(cache, job_outputs[job_id], len(jobs))
+                elapsed = time.perf_counter() - start
+                eta = elapsed / i * (len(pending) - i)
+                self.stdout.write(
+                    f"[{i + skipped}/{len(jobs)}] {names[job_id]} "
+                    f"({elapsed:.0f}s elapsed, ~{eta:.0f}s left)"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Prewarmed {len(pending)} cards in {time.perf_counter() - start:.1f}s."
+            )
+        )
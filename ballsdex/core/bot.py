@@ -22,9 +22,12 @@ from prometheus_client import Histogram
 from rich import box, print
 from rich.console import Console
 from rich.table import Table
+from tortoise import signals
 
 from ballsdex.core.commands import Core
 from ballsdex.core.dev import Dev
+from ballsdex.core.image_generator.service import RendererBusy, RenderService
+from ballsdex.core.image_generator.spawn_assets import SpawnAssetStore
 from ballsdex.core.metrics import PrometheusServer
 from ballsdex.core.models import (
     Ball,
@@ -33,11 +36,14 @@ from ballsdex.core.models import (
     Economy,
     Regime,
     Special,
+    ball_catch_names,
     balls,
     economies,
     regimes,
     specials,
 )
+from ballsdex.core.utils.attachments import AttachmentCache
+from ballsdex.core.utils.sampling import AliasTable, SpecialSchedule
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -164,6 +170,11 @@ class BallsDexBot(commands.AutoShardedBot):
 
         self.dev = dev
         self.prometheus_server: PrometheusServer | None = None
+        self.render_service = RenderService(settings.render_workers, settings.render_queue_size)
+        self.spawn_assets = SpawnAssetStore(
+            max_size=settings.render_spawn_max_size * 1024, format=settings.render_spawn_format
+        )
+        self.attachment_cache = AttachmentCache()
 
         self.tree.error(self.on_application_command_error)
         self.add_check(owner_check)  # Only owners are able to use text commands
@@ -176,6 +187,11 @@ class BallsDexBot(commands.AutoShardedBot):
         self.catch_log: set[int] = set()
         self.command_log: set[int] = set()
         self.locked_balls = TTLCache(maxsize=99999, ttl=60 * 30)
+        # enabled balls weighted by rarity, rebuilt with the cache
+        self.ball_table: AliasTable[Ball] = AliasTable([], [])
+        self.special_schedule = SpecialSchedule([])
+        Special.register_listener(signals.Signals.post_save, self.cache_special)
+        Special.register_listener(signals.Signals.post_delete, self.uncache_special)
 
         self.owner_ids: set[int]
 
@@ -212,6 +228,14 @@ class BallsDexBot(commands.AutoShardedBot):
     def get_emoji(self, id: int) -> discord.Emoji | None:
         return self.application_emojis.get(id) or super().get_emoji(id)
 
+    async def cache_special(self, sender: type[Special], instance: Special, *args):
+        specials[instance.pk] = instance
+        self.special_schedule = SpecialSchedule(specials.values())
+
+    async def uncache_special(self, sender: type[Special], instance: Special, *args):
+        specials.pop(instance.pk, None)
+        self.special_schedule = SpecialSchedule(specials.values())
+
     async def load_cache(self):
         table = Table(box=box.SIMPLE)
         table.add_column("Model", style="cyan")
@@ -222,9 +246,19 @@ class BallsDexBot(commands.AutoShardedBot):
             self.application_emojis[emoji.id] = emoji
 
         balls.clear()
+        ball_catch_names.clear()
         for ball in await Ball.all():
             balls[ball.pk] = ball
+            ball_catch_names[ball.pk] = ball.normalized_names()
         table.add_row(settings.collectible_name.title() + "s", str(len(balls)))
+        enabled_balls = [x for x in balls.values() if x.enabled]
+        self.ball_table = AliasTable(enabled_balls, [x.rarity for x in enabled_balls])
+
+        await asyncio.to_thread(self.spawn_assets.load, enabled_balls)
+        table.add_row(
+            "Spawn images",
+            f"{len(self.spawn_assets.assets)} ({self.spawn_assets.size / 1024 / 1024:.1f}MB)",
+        )
 
         regimes.clear()
         for regime in await Regime.all():
@@ -239,6 +273,7 @@ class BallsDexBot(commands.AutoShardedBot):
         specials.clear()
         for special in await Special.all():
             specials[special.pk] = special
+        self.special_schedule = SpecialSchedule(specials.values())
         table.add_row("Special events", str(len(specials)))
 
         self.blacklist = set()
@@ -287,6 +322,10 @@ class BallsDexBot(commands.AutoShardedBot):
             log.warning("Gateway proxy is not ready yet, waiting 30 more seconds...")
             await asyncio.sleep(30)
 
+    async def close(self):
+        self.render_service.shutdown()
+        await super().close()
+
     async def on_ready(self):
         if self.cogs != {}:
             return  # bot is reconnecting, no need to setup again
@@ -316,6 +355,11 @@ class BallsDexBot(commands.AutoShardedBot):
             )
 
         await self.load_cache()
+        self.render_service.start(
+            [x.background for x in regimes.values()]
+            + [x.background for x in specials.values() if x.background]
+            + [x.icon for x in economies.values()]
+        )
         grammar = "" if len(self.blacklist) == 1 else "s"
         if self.blacklist:
             log.info(f"{len(self.blacklist)} blacklisted user{grammar}.")
@@ -401,6 +445,13 @@ class BallsDexBot(commands.AutoShardedBot):
             )
         return True
 
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        self.attachment_cache.forget_message(payload.message_id)
+
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        for message_id in payload.message_ids:
+            self.attachment_cache.forget_message(message_id)
+
     async def on_command_error(
         self, context: commands.Context, exception: commands.errors.CommandError
     ):
@@ -489,6 +540,12 @@ class BallsDexBot(commands.AutoShardedBot):
         if isinstance(error, app_commands.CommandInvokeError):
             assert interaction.command
 
+            if isinstance(error.original, RendererBusy):
+                await send(
+                    "The card renderer is busy at the moment, please try again in a few seconds."
+                )
+                return
+
             if isinstance(error.original, discord.Forbidden):
                 await send("The bot does not have the permission to do something.")
                 # log to know where permissions are lacking
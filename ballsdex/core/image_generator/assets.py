@@ -0,0 +1,158 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from PIL import Image, ImageOps, ImageStat
+
+
+class AssetStats(NamedTuple):
+    hits: int
+    misses: int
+    evicted_bytes: int
+    size: int
+
+
+class _Entry(NamedTuple):
+    mtime: int
+    file_size: int
+    image: Image.Image
+    size: int
+
+
+class AssetCache:
+    """
+    An in-memory cache of decoded RGBA assets (backgrounds, artworks and economy icons),
+    optionally pre-fitted to the size they are pasted at.
+
+    Entries are checked against the modification time and size of their file on every access,
+    so editing an asset from the admin panel is picked up immediately. The memory used by the
+    decoded images is kept under `max_size` bytes by evicting the least recently used entries.
+
+    Images returned are shared between callers and must not be modified, use `Image.copy`
+    first.
+
+    Parameters
+    ----------
+    max_size: int
+        Memory budget of the cache in bytes.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self._entries: OrderedDict[tuple[str, tuple[int, int] | None], _Entry] = OrderedDict()
+        # mean brightness of image regions, keyed by path and region
+        self._brightness: dict[tuple[str, tuple[float, ...]], tuple[int, int, float]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evicted_bytes = 0
+
+    def _evict(self):
+        while self.size > self.max_size and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry.size
+            self._evicted_bytes += entry.size
+
+    def resize(self, max_size: int):
+        with self._lock:
+            self.max_size = max_size
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._brightness.clear()
+            self.size = 0
+
+    def get(self, path: str, fit: tuple[int, int] | None = None) -> Image.Image:
+        """
+        Return the decoded RGBA image of an asset.
+
+        Parameters
+        ----------
+        path: str
+            Path to the image file.
+        fit: tuple[int, int] | None
+            If set, the image is cropped and resized to this size with `ImageOps.fit`.
+
+        Returns
+        -------
+        Image.Image
+            The shared decoded image.
+        """
+        stat = os.stat(path)
+        key = (path, fit)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.mtime == stat.st_mtime_ns and entry.file_size == stat.st_size:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.image
+            self._misses += 1
+
+        with Image.open(path) as file:
+            image = file.convert("RGBA")
+        if fit:
+            fitted = ImageOps.fit(image, fit)
+            image.close()
+            image = fitted
+        size = image.width * image.height * 4
+
+        with self._lock:
+            if old := self._entries.pop(key, None):
+                self.size -= old.size
+            if size <= self.max_size:
+                self._entries[key] = _Entry(stat.st_mtime_ns, stat.st_size, image, size)
+                self.size += size
+                self._evict()
+        return image
+
+    def get_brightness(self, path: str, box: tuple[float, float, float, float]) -> float:
+        """
+        Return the mean brightness (0-255) of a region of an asset. The value is remembered
+        until the file is modified.
+
+        Parameters
+        ----------
+        path: str
+            Path to the image file.
+        box: tuple[float, float, float, float]
+            The region as left, upper, right and lower bounds, in fractions of the image size.
+
+        Returns
+        -------
+        float
+            The mean of the region converted to grayscale, transparency is ignored.
+        """
+        stat = os.stat(path)
+        key = (path, box)
+        with self._lock:
+            cached = self._brightness.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        image = self.get(path)
+        region = image.crop(
+            (
+                int(image.width * box[0]),
+                int(image.height * box[1]),
+                int(image.width * box[2]),
+                int(image.height * box[3]),
+            )
+        )
+        brightness = ImageStat.Stat(region.convert("L")).mean[0]
+        with self._lock:
+            self._brightness[key] = (stat.st_mtime_ns, stat.st_size, brightness)
+        return brightness
+
+    def take_stats(self) -> AssetStats:
+        """
+        Return the number of hits, misses and evicted bytes since the last call, along with the
+        current memory used.
+        """
+        with self._lock:
+            stats = AssetStats(self._hits, self._misses, self._evicted_bytes, self.size)
+            self._hits = self._misses = self._evicted_bytes = 0
+        return stats
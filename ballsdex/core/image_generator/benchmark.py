@@ -0,0 +1,242 @@
+"""
+Card rendering benchmark, running without the bot or a database.
+
+Synthetic backgrounds, artworks and economy icons are generated in a temporary directory, then
+cards are rendered for many combinations of inputs and the latency, memory and output size of
+each configuration are reported.
+
+Usage: python3 -m ballsdex.core.image_generator.benchmark [-n 50] [-o results.json]
+To catch regressions, compare with the results of another branch using --compare old.json
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+
+import PIL
+from PIL import Image
+from rich.console import Console
+from rich.table import Table
+
+from ballsdex.core.image_generator import image_gen
+from ballsdex.core.image_generator.image_gen import CardSpec, render_card
+from ballsdex.settings import settings
+
+SHORT_DESCRIPTION = "Deals extra damage."
+LONG_DESCRIPTION = (
+    "When this countryball enters the battle, it deals massive damage to every opponent "
+    "and heals its allies for half of the damage dealt.\n"
+    "Can only be used once per battle, and loses half of its attack afterwards."
+)
+
+
+@dataclass
+class Config:
+    name: str
+    long_description: bool
+    special: bool
+    show_rarity: bool
+    warm: bool
+
+
+def generate_assets(path: Path):
+    """
+    Write synthetic PNG assets with the same dimensions as the real ones. Noise is used so
+    that decoding and compression costs are close to real artworks.
+    """
+
+    def noisy(size: tuple[int, int], sigma: int) -> Image.Image:
+        bands = [Image.effect_noise(size, sigma) for _ in range(3)]
+        return Image.merge("RGB", bands).convert("RGBA")
+
+    noisy((1428, 2000), 40).save(path / "regime.png")
+    noisy((1428, 2000), 80).save(path / "special.png")
+    noisy((1500, 1000), 60).save(path / "artwork.png")
+    noisy((512, 512), 20).save(path / "economy.png")
+
+
+def fake_instance(config: Config) -> SimpleNamespace:
+    """
+    Build an object with the attributes of `BallInstance` read by `CardSpec.from_instance`.
+    """
+    ball = SimpleNamespace(
+        pk=1,
+        country="Benchmarkland",
+        short_name=None,
+        capacity_name="Synthetic strike",
+        capacity_description=LONG_DESCRIPTION if config.long_description else SHORT_DESCRIPTION,
+        credits="Benchmark artist",
+        rarity=1.5,
+        collection_card="artwork.png",
+        cached_regime=SimpleNamespace(name="Regime", background="regime.png"),
+        cached_economy=SimpleNamespace(icon="economy.png"),
+    )
+    special = SimpleNamespace(name="Special", credits="Special artist") if config.special else None
+    return SimpleNamespace(
+        countryball=ball,
+        specialcard=special,
+        special_card="special.png" if special else None,
+        health=random.randint(500, 5000),
+        attack=random.randint(500, 5000),
+    )
+
+
+def clear_caches():
+    image_gen.static_layer_cache.clear()
+    image_gen.asset_cache.clear()
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def run_config(config: Config, media_path: str, iterations: int) -> dict:
+    settings.show_rarity = config.show_rarity
+    clear_caches()
+    if config.warm:
+        render_card(CardSpec.from_instance(fake_instance(config)), media_path)  # type: ignore
+
+    timings: list[float] = []
+    sizes: list[int] = []
+    for _ in range(iterations):
+        if not config.warm:
+            clear_caches()
+        instance = fake_instance(config)
+        t1 = time.perf_counter()
+        image, kwargs = render_card(CardSpec.from_instance(instance), media_path)  # type: ignore
+        buffer = BytesIO()
+        image.save(buffer, **kwargs)
+        timings.append((time.perf_counter() - t1) * 1000)
+        sizes.append(buffer.tell())
+        image.close()
+
+    quantiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+    return {
+        "name": config.name,
+        "long_description": config.long_description,
+        "special": config.special,
+        "show_rarity": config.show_rarity,
+        "warm": config.warm,
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "output_bytes": round(statistics.fmean(sizes)),
+    }
+
+
+def print_results(results: list[dict], baseline: dict[str, dict] | None):
+    table = Table(title="Card rendering benchmark")
+    table.add_column("Configuration", style="cyan")
+    for column in ("p50 (ms)", "p95 (ms)", "Peak RSS (MB)", "Size (bytes)"):
+        table.add_column(column, justify="right")
+    if baseline is not None:
+        table.add_column("p95 change", justify="right")
+
+    for result in results:
+        row = [
+            result["name"],
+            str(result["p50_ms"]),
+            str(result["p95_ms"]),
+            str(result["peak_rss_mb"]),
+            str(result["output_bytes"]),
+        ]
+        if baseline is not None:
+            if old := baseline.get(result["name"]):
+                change = (result["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+                color = "red" if change > 0 else "green"
+                row.append(f"[{color}]{change:+.1f}%[/{color}]")
+            else:
+                row.append("-")
+        table.add_row(*row)
+    Console().print(table)
+
+
+def main(arguments: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m ballsdex.core.image_generator.benchmark",
+        description="Benchmark card rendering with synthetic assets",
+    )
+    parser.add_argument("-n", "--iterations", type=int, default=50, help="Renders per config")
+    parser.add_argument("-o", "--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="Previous JSON results to compare with")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=20,
+        help="With --compare, exit with an error if a p95 latency grows by more than this "
+        "percentage",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random stats")
+    args = parser.parse_args(arguments)
+    random.seed(args.seed)
+
+    configs = [
+        Config(
+            name="{}-{}-{}-{}".format(
+                "long" if long_description else "short",
+                "special" if special else "regime",
+                "rarity" if show_rarity else "norarity",
+                "warm" if warm else "cold",
+            ),
+            long_description=long_description,
+            special=special,
+            show_rarity=show_rarity,
+            warm=warm,
+        )
+        for long_description, special, show_rarity, warm in itertools.product(
+            (False, True), repeat=4
+        )
+    ]
+
+    with tempfile.TemporaryDirectory(prefix="ballsdex-bench-") as tmp:
+        generate_assets(Path(tmp))
+        results = [run_config(x, tmp + "/", args.iterations) for x in configs]
+
+    baseline: dict[str, dict] | None = None
+    if args.compare:
+        baseline = {x["name"]: x for x in json.loads(args.compare.read_text())["results"]}
+    print_results(results, baseline)
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "pillow": PIL.__version__,
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
+
+    if baseline is not None:
+        regressions = [
+            x["name"]
+            for x in results
+            if x["name"] in baseline
+            and x["p95_ms"] > baseline[x["name"]]["p95_ms"] * (1 + args.max_regression / 100)
+        ]
+        if regressions:
+            print(f"p95 regression above {args.max_regression}%: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,10 +1,17 @@
+import hashlib
 import os
 import textwrap
+import threading
+from dataclasses import dataclass, replace
+from io import BytesIO
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable, cast
 
-from PIL import Image, ImageDraw, ImageFont, ImageOps
+from cachetools import LRUCache
+from PIL import Image, ImageDraw, ImageFont
 
+from ballsdex.core.image_generator.assets import AssetCache
+from ballsdex.core.image_generator.render_cache import RenderCache, asset_hash
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -19,7 +26,10 @@ RECTANGLE_WIDTH = WIDTH - 40
 RECTANGLE_HEIGHT = (HEIGHT // 5) * 2
 
 CORNERS = ((34, 261), (1393, 992))
-artwork_size = [b - a for a, b in zip(*CORNERS)]
+artwork_size = cast(tuple[int, int], tuple(b - a for a, b in zip(*CORNERS)))
+
+# Increase this when changing the card layout to invalidate the rendered cards cache
+CARD_VERSION = 1
 
 # ===== TIP =====
 #
@@ -39,48 +49,193 @@ capacity_description_font = ImageFont.truetype(str(SOURCES_PATH / "OpenSans-Semi
 stats_font = ImageFont.truetype(str(SOURCES_PATH / "Bobby Jones Soft.otf"), 130)
 credits_font = ImageFont.truetype(str(SOURCES_PATH / "arial.ttf"), 40)
 
-credits_color_cache = {}
+# Decoded backgrounds, artworks and economy icons, resized from config.yml by RenderService
+asset_cache = AssetCache(256 * 1024 * 1024)
+
+# Pre-composited cards without the HP/ATK numbers, keyed by everything else that is drawn.
+# Entries are full-size RGBA images (~12MB each), so the cache is bounded in bytes.
+STATIC_LAYER_CACHE_SIZE = 256 * 1024 * 1024
+static_layer_cache: LRUCache[tuple, Image.Image] = LRUCache(
+    maxsize=STATIC_LAYER_CACHE_SIZE,
+    getsizeof=lambda image: image.width * image.height * len(image.getbands()),
+)
+static_layer_lock = threading.Lock()
 
 
-def get_credit_color(image: Image.Image, region: tuple) -> tuple:
-    image = image.crop(region)
-    brightness = sum(image.convert("L").getdata()) / image.width / image.height  # type: ignore
+def get_credit_color(background_path: str) -> tuple:
+    """
+    Pick black or white credits depending on the brightness of the bottom of the background.
+    """
+    brightness = asset_cache.get_brightness(background_path, (0, 0.8, 1, 1))
     return (0, 0, 0, 255) if brightness > 100 else (255, 255, 255, 255)
 
 
-def draw_card(
-    ball_instance: "BallInstance",
+@dataclass(frozen=True, slots=True)
+class CardSpec:
+    """
+    Everything needed to draw a card, detached from the database models and caches so it can
+    be pickled and sent to a rendering process.
+
+    Use `CardSpec.from_instance` to build one from a `BallInstance`.
+    """
+
+    ball_id: int | None
+    title: str
+    capacity_name: str
+    capacity_description: str
+    credits: str
+    # None if rarity is not displayed on cards
+    rarity: float | None
+    collection_card: str
+    background: str
+    economy_icon: str | None
+    special_credits: str | None
+    health: int
+    attack: int
+
+    @classmethod
+    def from_instance(cls, ball_instance: "BallInstance") -> "CardSpec":
+        ball = ball_instance.countryball
+        special = ball_instance.specialcard
+        economy = ball.cached_economy
+        return cls(
+            ball_id=ball.pk,
+            title=ball.short_name or ball.country,
+            capacity_name=ball.capacity_name,
+            capacity_description=ball.capacity_description,
+            credits=ball.credits,
+            rarity=ball.rarity if settings.show_rarity else None,
+            collection_card=ball.collection_card,
+            background=ball_instance.special_card or ball.cached_regime.background,
+            economy_icon=economy.icon if economy else None,
+            # credited only when the special card is used as background, as above
+            special_credits=special.credits if special and ball_instance.special_card else None,
+            health=ball_instance.health,
+            attack=ball_instance.attack,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CardEncoding:
+    """
+    How a rendered card is encoded, and at which size.
+
+    Use `CardEncoding.from_settings` to build one from the configuration.
+    """
+
+    format: str = "WEBP"
+    # 0-100, ignored by PNG and lossless WEBP
+    quality: int = 80
+    # WEBP only, 0 (fast) to 6 (slower but smaller)
+    method: int = 4
+    lossless: bool = False
+    # width of a thumbnail, None for the full size card
+    width: int | None = None
+
+    @classmethod
+    def from_settings(cls, thumbnail: bool = False) -> "CardEncoding":
+        return cls(
+            format=settings.render_format,
+            quality=settings.render_quality,
+            method=settings.render_method,
+            lossless=settings.render_lossless,
+            width=settings.render_thumbnail_width if thumbnail else None,
+        )
+
+    @property
+    def extension(self) -> str:
+        return {"WEBP": "webp", "JPEG": "jpg", "AVIF": "avif", "PNG": "png"}[self.format]
+
+    @property
+    def save_kwargs(self) -> dict[str, Any]:
+        match self.format:
+            case "WEBP":
+                return {
+                    "format": "WEBP",
+                    "quality": self.quality,
+                    "method": self.method,
+                    "lossless": self.lossless,
+                }
+            case "JPEG":
+                return {"format": "JPEG", "quality": self.quality, "optimize": True}
+            case "AVIF":
+                return {"format": "AVIF", "quality": self.quality}
+            case _:
+                return {"format": self.format}
+
+
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _static_inputs(card: CardSpec, media_path: str, fingerprint: Callable[[str], Any]) -> tuple:
+    """
+    Return every input drawn on the card except the stats. `fingerprint` is called with the
+    path of each asset file to detect edited files.
+    """
+    static = replace(card, health=0, attack=0)
+    return (
+        static,
+        fingerprint(media_path + card.background),
+        fingerprint(media_path + card.collection_card),
+        fingerprint(media_path + card.economy_icon) if card.economy_icon else None,
+    )
+
+
+def card_cache_key(
+    card: CardSpec,
     media_path: str = "./admin_panel/media/",
-) -> tuple[Image.Image, dict[str, Any]]:
-    ball = ball_instance.countryball
-    ball_health = (237, 115, 101, 255)
-    ball_credits = ball.credits
+    encoding: CardEncoding | None = None,
+) -> str:
+    """
+    Return a hash of every input affecting the rendered card, including the content of the
+    asset files and the encoding. Two cards with the same key produce byte-identical images.
+    """
+    inputs = (
+        CARD_VERSION,
+        *_static_inputs(card, media_path, asset_hash),
+        card.health,
+        card.attack,
+        encoding or CardEncoding(),
+    )
+    return hashlib.sha256(repr(inputs).encode()).hexdigest()
+
+
+def static_layer_key(card: CardSpec, media_path: str = "./admin_panel/media/") -> str:
+    """
+    Return a hash of every input affecting the static layer of a card, used to store it in
+    the render cache.
+    """
+    inputs = (CARD_VERSION, "static", *_static_inputs(card, media_path, asset_hash))
+    return hashlib.sha256(repr(inputs).encode()).hexdigest()
+
+
+def draw_static_layer(card: CardSpec, media_path: str = "./admin_panel/media/") -> Image.Image:
+    """
+    Draw everything on the card except the HP and ATK numbers: background, title, ability,
+    rarity, credits, artwork and economy icon.
+    """
     special_credits = ""
-    card_name = ball.cached_regime.name
-    if special_image := ball_instance.special_card:
-        card_name = getattr(ball_instance.specialcard, "name", card_name)
-        image = Image.open(media_path + special_image)
-        if ball_instance.specialcard and ball_instance.specialcard.credits:
-            special_credits += f" • Special Author: {ball_instance.specialcard.credits}"
-    else:
-        image = Image.open(media_path + ball.cached_regime.background)
-    image = image.convert("RGBA")
+    if card.special_credits:
+        special_credits += f" • Special Author: {card.special_credits}"
+    image = asset_cache.get(media_path + card.background).copy()
     icon = (
-        Image.open(media_path + ball.cached_economy.icon).convert("RGBA")
-        if ball.cached_economy
-        else None
+        asset_cache.get(media_path + card.economy_icon, (192, 192)) if card.economy_icon else None
     )
 
     draw = ImageDraw.Draw(image)
     draw.text(
         (50, 20),
-        ball.short_name or ball.country,
+        card.title,
         font=title_font,
         stroke_width=2,
         stroke_fill=(0, 0, 0, 255),
     )
 
-    cap_name = textwrap.wrap(f"Ability: {ball.capacity_name}", width=26)
+    cap_name = textwrap.wrap(f"Ability: {card.capacity_name}", width=26)
 
     for i, line in enumerate(cap_name):
         draw.text(
@@ -94,7 +249,7 @@ def draw_card(
 
     capacity_description_lines = (
         wrapped_line
-        for newline in ball.capacity_description.splitlines()
+        for newline in card.capacity_description.splitlines()
         for wrapped_line in textwrap.wrap(newline, 32)
     )
 
@@ -107,56 +262,125 @@ def draw_card(
             stroke_fill=(0, 0, 0, 255),
         )
 
-    draw.text(
-        (320, 1670),
-        str(ball_instance.health),
-        font=stats_font,
-        fill=ball_health,
-        stroke_width=1,
-        stroke_fill=(0, 0, 0, 255),
-    )
-    draw.text(
-        (1120, 1670),
-        str(ball_instance.attack),
-        font=stats_font,
-        fill=(252, 194, 76, 255),
-        stroke_width=1,
-        stroke_fill=(0, 0, 0, 255),
-        anchor="ra",
-    )
-    if settings.show_rarity:
+    if card.rarity is not None:
         draw.text(
             (1200, 50),
-            str(ball.rarity),
+            str(card.rarity),
             font=stats_font,
             stroke_width=2,
             stroke_fill=(0, 0, 0, 255),
         )
-    if card_name in credits_color_cache:
-        credits_color = credits_color_cache[card_name]
-    else:
-        credits_color = get_credit_color(
-            image, (0, int(image.height * 0.8), image.width, image.height)
-        )
-        credits_color_cache[card_name] = credits_color
+    credits_color = get_credit_color(media_path + card.background)
     draw.text(
         (30, 1870),
         # Modifying the line below is breaking the licence as you are removing credits
         # If you don't want to receive a DMCA, just don't
-        f"Created by El Laggron{special_credits}\n" f"Artwork author: {ball_credits}",
+        f"Created by El Laggron{special_credits}\n" f"Artwork author: {card.credits}",
         font=credits_font,
         fill=credits_color,
         stroke_width=0,
         stroke_fill=(255, 255, 255, 255),
     )
 
-    artwork = Image.open(media_path + ball.collection_card).convert("RGBA")
-    image.paste(ImageOps.fit(artwork, artwork_size), CORNERS[0])  # type: ignore
+    artwork = asset_cache.get(media_path + card.collection_card, artwork_size)
+    image.paste(artwork, CORNERS[0])
 
     if icon:
-        icon = ImageOps.fit(icon, (192, 192))
         image.paste(icon, (1200, 30), mask=icon)
-        icon.close()
-    artwork.close()
 
-    return image, {"format": "WEBP"}
+    return image
+
+
+def get_static_layer(
+    card: CardSpec, media_path: str = "./admin_panel/media/", cache: RenderCache | None = None
+) -> Image.Image:
+    """
+    Return the cached static layer of this card, drawing it if needed.
+
+    If a render cache is given, static layers missing from memory are looked up there before
+    being drawn, and newly drawn layers are stored in it, so they can be shared between
+    processes and prepared ahead of time.
+
+    The returned image is shared and must not be modified, use `Image.copy` first.
+    """
+    key = (media_path, *_static_inputs(card, media_path, _mtime))
+    with static_layer_lock:
+        image = static_layer_cache.get(key)
+    if image is not None:
+        return image
+
+    cache_key = static_layer_key(card, media_path) if cache else None
+    if cache and cache_key and (file := cache.open(cache_key)):
+        with file, Image.open(file) as stored:
+            image = stored.convert("RGBA")
+    else:
+        image = draw_static_layer(card, media_path)
+        if cache and cache_key:
+            buffer = BytesIO()
+            # lossless, and favor decoding speed over size
+            image.save(buffer, format="PNG", compress_level=1)
+            cache.put(cache_key, buffer.getvalue())
+    with static_layer_lock:
+        try:
+            static_layer_cache[key] = image
+        except ValueError:  # larger than the whole cache
+            pass
+    return image
+
+
+def render_card(
+    card: CardSpec,
+    media_path: str = "./admin_panel/media/",
+    encoding: CardEncoding | None = None,
+    cache: RenderCache | None = None,
+) -> tuple[Image.Image, dict[str, Any]]:
+    """
+    Draw a card from its `CardSpec`. The static layer is taken from cache, only the HP and
+    ATK numbers are drawn on a copy.
+
+    The image is resized and converted for the given encoding (full size WEBP by default),
+    the returned dict holds the arguments to pass to `Image.save`. The render cache, if
+    given, is used to share static layers (see `get_static_layer`).
+    """
+    encoding = encoding or CardEncoding()
+    ball_health = (237, 115, 101, 255)
+    image = get_static_layer(card, media_path, cache).copy()
+
+    draw = ImageDraw.Draw(image)
+    draw.text(
+        (320, 1670),
+        str(card.health),
+        font=stats_font,
+        fill=ball_health,
+        stroke_width=1,
+        stroke_fill=(0, 0, 0, 255),
+    )
+    draw.text(
+        (1120, 1670),
+        str(card.attack),
+        font=stats_font,
+        fill=(252, 194, 76, 255),
+        stroke_width=1,
+        stroke_fill=(0, 0, 0, 255),
+        anchor="ra",
+    )
+
+    if encoding.width and encoding.width < image.width:
+        thumbnail = image.resize(
+            (encoding.width, round(image.height * encoding.width / image.width)),
+            Image.Resampling.LANCZOS,
+        )
+        image.close()
+        image = thumbnail
+    if encoding.format == "JPEG":
+        image = image.convert("RGB")
+
+    return image, encoding.save_kwargs
+
+
+def draw_card(
+    ball_instance: "BallInstance",
+    media_path: str = "./admin_panel/media/",
+    encoding: CardEncoding | None = None,
+) -> tuple[Image.Image, dict[str, Any]]:
+    return render_card(CardSpec.from_instance(ball_instance), media_path, encoding)
@@ -0,0 +1,216 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO
+
+from ballsdex.settings import settings
+
+log = logging.getLogger("ballsdex.core.image_generator.render_cache")
+
+# fraction of the budget written by a process after which it scans the directory again
+RESCAN_RATIO = 0.1
+# temporary files older than this (in seconds) are left over from interrupted writes
+STALE_TEMP_AGE = 3600
+
+_asset_hashes: dict[str, tuple[int, int, str]] = {}
+_asset_hashes_lock = threading.Lock()
+
+
+def asset_hash(path: str) -> str:
+    """
+    Return the SHA-256 digest of an asset file. Digests are remembered for as long as the
+    modification time and size of the file do not change.
+
+    Parameters
+    ----------
+    path: str
+        Path to the file to hash.
+
+    Returns
+    -------
+    str
+        The hexadecimal digest, or an empty string if the file could not be read.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ""
+    with _asset_hashes_lock:
+        cached = _asset_hashes.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    with open(path, "rb") as file:
+        digest = hashlib.file_digest(file, "sha256").hexdigest()
+    with _asset_hashes_lock:
+        _asset_hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+class RenderCache:
+    """
+    A content-addressed cache of rendered cards on disk, surviving restarts.
+
+    Files are named after the hash of every input that affects the image, so an entry never
+    needs to be invalidated, it simply stops being requested. The total size is kept under
+    `max_size` bytes by evicting the least recently used files (access order is persisted with
+    the files' modification time).
+
+    Several processes share the directory (the rendering workers, the bot and the prewarm
+    command), and each of them only knows its own writes. The real size of the directory is
+    therefore scanned again before evicting, and whenever a process wrote a tenth of the
+    budget since its last scan.
+
+    Parameters
+    ----------
+    path: Path
+        Directory where the rendered files are stored. Created if missing.
+    max_size: int
+        Byte budget of the cache.
+    """
+
+    def __init__(self, path: Path, max_size: int):
+        self.path = path
+        self.max_size = max_size
+        self.size = 0
+        self._index: OrderedDict[str, int] = OrderedDict()
+        # bytes written by this process since the last scan
+        self._written = 0
+        self._lock = threading.Lock()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._rescan()
+        log.debug(f"Render cache loaded with {len(self._index)} entries ({self.size} bytes).")
+
+    def _scan(self) -> OrderedDict[str, int]:
+        entries: list[tuple[int, str, int]] = []
+        now = time.time()
+        for file in self.path.glob("*/*"):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:  # evicted by another process meanwhile
+                continue
+            if file.name.startswith("."):
+                # temporary file, either being written by another process or left over
+                if now - stat.st_mtime > STALE_TEMP_AGE:
+                    file.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime_ns, file.name, stat.st_size))
+        return OrderedDict((key, size) for _, key, size in sorted(entries))
+
+    def _rescan(self):
+        """
+        Rebuild the index from the files on disk, including the ones written and accessed by
+        other processes, then evict files until the real size fits the budget.
+        """
+        index = self._scan()
+        with self._lock:
+            self._index = index
+            self.size = sum(index.values())
+            self._written = 0
+            self._evict()
+
+    def _file_path(self, key: str) -> Path:
+        return self.path / key[:2] / key
+
+    def _evict(self):
+        # must be called with the lock held, after a scan
+        while self.size > self.max_size and self._index:
+            key, size = self._index.popitem(last=False)
+            self.size -= size
+            self._file_path(key).unlink(missing_ok=True)
+
+    def open(self, key: str) -> BinaryIO | None:
+        """
+        Open a cached file for reading and mark it as recently used.
+
+        Parameters
+        ----------
+        key: str
+            The content hash of the render.
+
+        Returns
+        -------
+        BinaryIO | None
+            The opened file, which must be closed by the caller, or `None` on cache miss.
+        """
+        file_path = self._file_path(key)
+        try:
+            file = open(file_path, "rb")
+        except FileNotFoundError:
+            with self._lock:
+                if key in self._index:
+                    self.size -= self._index.pop(key)
+            return None
+        try:
+            os.utime(file_path)
+        except OSError:
+            pass
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+            else:
+                # written by another process sharing this directory
+                size = os.fstat(file.fileno()).st_size
+                self._index[key] = size
+                self.size += size
+        return file
+
+    def put(self, key: str, data: bytes):
+        """
+        Store a rendered file. The data is written to a temporary file which is then renamed,
+        so readers never observe a partial file.
+
+        Parameters
+        ----------
+        key: str
+            The content hash of the render.
+        data: bytes
+            The encoded image.
+        """
+        if len(data) > self.max_size:
+            return
+        file_path = self._file_path(key)
+        file_path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, prefix=".")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, file_path)
+        except OSError:
+            log.warning(f"Failed to write {key} to the render cache", exc_info=True)
+            Path(tmp_path).unlink(missing_ok=True)
+            return
+        with self._lock:
+            if key in self._index:
+                self.size -= self._index.pop(key)
+            self._index[key] = len(data)
+            self.size += len(data)
+            self._written += len(data)
+            rescan = self.size > self.max_size or self._written > self.max_size * RESCAN_RATIO
+        if rescan:
+            self._rescan()
+
+
+_render_cache: RenderCache | None = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> RenderCache | None:
+    """
+    Return the render cache configured in config.yml, or `None` if it is disabled.
+    """
+    global _render_cache
+    if not settings.render_cache_path:
+        return None
+    path = Path(settings.render_cache_path)
+    max_size = settings.render_cache_max_size * 1024 * 1024
+    # called from several threads, the directory must be scanned only once
+    with _render_cache_lock:
+        if _render_cache is None or _render_cache.path != path:
+            _render_cache = RenderCache(path, max_size)
+        _render_cache.max_size = max_size
+        return _render_cache
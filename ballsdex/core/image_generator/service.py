@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+from ballsdex.core.image_generator.assets import AssetStats
+from ballsdex.core.image_generator.image_gen import (
+    CardEncoding,
+    CardSpec,
+    asset_cache,
+    card_cache_key,
+    render_card,
+)
+from ballsdex.core.image_generator.render_cache import RenderCache, get_render_cache
+from ballsdex.core.metrics import (
+    asset_cache_evicted_bytes,
+    asset_cache_hits,
+    asset_cache_misses,
+    asset_cache_size,
+    render_duration,
+    render_queue_wait,
+    render_rejected,
+)
+from ballsdex.settings import settings
+
+if TYPE_CHECKING:
+    from ballsdex.core.models import BallInstance
+
+log = logging.getLogger("ballsdex.core.image_generator.service")
+
+MEDIA_PATH = "./admin_panel/media/"
+
+# state of a worker process, set by the initializer
+_is_worker = False
+_worker_cache: RenderCache | None = None
+
+
+class RendererBusy(Exception):
+    """
+    Raised when too many cards are already waiting to be rendered.
+    """
+
+
+def _init_worker(
+    cache_path: str | None, cache_max_size: int, asset_cache_size: int, preload: list[str]
+):
+    """
+    Initializer of the rendering processes. Importing the `image_gen` module already loaded
+    the fonts, this opens the render cache and decodes the shared assets (backgrounds and
+    economy icons) once for the whole life of the worker.
+    """
+    global _is_worker, _worker_cache
+    _is_worker = True
+    if cache_path:
+        _worker_cache = RenderCache(Path(cache_path), cache_max_size)
+    asset_cache.resize(asset_cache_size)
+    for path in preload:
+        try:
+            asset_cache.get(path)
+        except OSError:
+            pass
+
+
+def _lookup(card: CardSpec, encoding: CardEncoding) -> tuple[str | None, BinaryIO | None]:
+    """
+    Return the render cache key of a card and the cached file if there is one. This hashes
+    asset files and reads the disk, it must run outside of the event loop.
+    """
+    cache = get_render_cache()
+    if not cache:
+        return None, None
+    key = card_cache_key(card, MEDIA_PATH, encoding)
+    return key, cache.open(key)
+
+
+def _render(
+    card: CardSpec, encoding: CardEncoding, key: str | None, submitted_at: float
+) -> tuple[bytes, float, float, int, AssetStats]:
+    """
+    Render and encode a card, storing it in the render cache if a key is given.
+
+    Returns the encoded card, the time spent waiting in the queue, the time spent rendering,
+    and the ID and asset cache statistics of the process.
+    """
+    started_at = time.time()
+    # settings are not loaded in the workers, their cache is only configured by the initializer
+    cache = _worker_cache if _is_worker else get_render_cache()
+    image, kwargs = render_card(card, MEDIA_PATH, encoding, cache)
+    buffer = BytesIO()
+    image.save(buffer, **kwargs)
+    image.close()
+    data = buffer.getvalue()
+    if cache and key:
+        cache.put(key, data)
+    duration = time.time() - started_at
+    return data, started_at - submitted_at, duration, os.getpid(), asset_cache.take_stats()
+
+
+class RenderService:
+    """
+    Bot-wide card rendering service, owned by `BallsDexBot`.
+
+    Cards are rendered in a pool of long-lived processes, keeping the CPU-heavy Pillow work
+    away from the event loop. The number of pending renders is bounded: once `queue_size`
+    cards are waiting for a worker, new requests are rejected with `RendererBusy` instead of
+    queueing indefinitely.
+
+    Parameters
+    ----------
+    workers: int
+        Number of rendering processes. If 0, cards are rendered in a thread of the bot process.
+    queue_size: int
+        Maximum number of cards waiting for a free worker.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.pending = 0
+        self.preload: list[str] = []
+        self.executor: ProcessPoolExecutor | None = None
+
+    def start(self, preload: list[str] | None = None):
+        """
+        Start the rendering processes.
+
+        Parameters
+        ----------
+        preload: list[str] | None
+            Names of media files decoded by each worker on startup.
+        """
+        asset_cache_size = settings.render_asset_cache_size * 1024 * 1024
+        self.preload = preload or []
+        if self.workers <= 0:
+            asset_cache.resize(asset_cache_size)
+            return
+        if self.executor is not None:
+            return
+        # spawn instead of fork, the bot process holds sockets and threads
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                settings.render_cache_path,
+                settings.render_cache_max_size * 1024 * 1024,
+                asset_cache_size,
+                [MEDIA_PATH + x for x in self.preload],
+            ),
+        )
+        log.info(f"Card renderer started with {self.workers} processes.")
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def _submit(
+        self, card: CardSpec, encoding: CardEncoding, key: str | None
+    ) -> tuple[bytes, float, float, int, AssetStats]:
+        """
+        Run `_render` in the workers. A worker dying (out of memory, crash in Pillow) breaks
+        the whole pool, it is then started again and the card is submitted once more.
+        """
+        for _ in range(2):
+            executor = self.executor
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    executor, _render, card, encoding, key, time.time()
+                )
+            except BrokenProcessPool:
+                # renders failing together must restart the pool only once
+                if executor is not None and executor is self.executor:
+                    log.error("A card rendering process died, restarting the renderer")
+                    self.shutdown()
+                    self.start(self.preload)
+        raise RendererBusy()
+
+    async def render(
+        self, ball_instance: "BallInstance", encoding: CardEncoding | None = None
+    ) -> BinaryIO:
+        """
+        Return the card of a ball instance, from the render cache if possible.
+
+        Parameters
+        ----------
+        ball_instance: BallInstance
+            The ball instance to render.
+        encoding: CardEncoding | None
+            The output encoding, defaults to the full size card configured in settings.
+
+        Raises
+        ------
+        RendererBusy
+            Too many cards are already waiting to be rendered, or the rendering processes
+            keep dying.
+        """
+        card = CardSpec.from_instance(ball_instance)
+        # built here, settings are not loaded in the rendering processes
+        encoding = encoding or CardEncoding.from_settings()
+        key, file = await asyncio.to_thread(_lookup, card, encoding)
+        if file:
+            return file
+
+        if self.pending >= max(self.workers, 1) + self.queue_size:
+            render_rejected.inc()
+            raise RendererBusy()
+        self.pending += 1
+        try:
+            data, wait, duration, pid, stats = await self._submit(card, encoding, key)
+        finally:
+            self.pending -= 1
+        render_queue_wait.observe(wait)
+        render_duration.observe(duration)
+        asset_cache_hits.inc(stats.hits)
+        asset_cache_misses.inc(stats.misses)
+        asset_cache_evicted_bytes.inc(stats.evicted_bytes)
+        asset_cache_size.labels(worker=pid).set(stats.size)
+        return BytesIO(data)
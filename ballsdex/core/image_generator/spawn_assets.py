@@ -0,0 +1,134 @@
+import logging
+import os
+from dataclasses import dataclass
+from io import BytesIO
+from typing import TYPE_CHECKING, Iterable
+
+import discord
+from PIL import Image
+
+if TYPE_CHECKING:
+    from ballsdex.core.models import Ball
+
+log = logging.getLogger("ballsdex.core.image_generator.spawn_assets")
+
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg", "PNG": "png"}
+
+
+@dataclass(slots=True)
+class SpawnAsset:
+    data: bytes
+    extension: str
+    # modification time and size of the source file, to skip unchanged files on reload
+    mtime: int
+    file_size: int
+
+
+def recompress(data: bytes, max_size: int, format: str) -> tuple[bytes, str] | None:
+    """
+    Encode an image again until it fits in `max_size` bytes, lowering the quality first,
+    then the resolution.
+
+    Returns the new data and its extension, or `None` if the image could not be made smaller
+    (animations are left untouched).
+    """
+    with Image.open(BytesIO(data)) as image:
+        if getattr(image, "is_animated", False):
+            return None
+        image = image.convert("RGB" if format == "JPEG" else "RGBA")
+    # PNG is lossless, only the resolution can be lowered
+    qualities = (90, 80, 70, 60) if format != "PNG" else (100,)
+    best: bytes | None = None
+    while True:
+        for quality in qualities:
+            buffer = BytesIO()
+            image.save(buffer, format=format, quality=quality)
+            best = buffer.getvalue()
+            if len(best) <= max_size:
+                return best, EXTENSIONS[format]
+        if image.width <= 256:
+            break
+        image = image.resize(
+            (image.width * 3 // 4, image.height * 3 // 4), Image.Resampling.LANCZOS
+        )
+    if best is not None and len(best) < len(data):
+        return best, EXTENSIONS[format]
+    return None
+
+
+class SpawnAssetStore:
+    """
+    In-memory copy of the spawn images (`Ball.wild_card`), so spawning a countryball does not
+    read the file from disk every time. The store is refreshed along with the bot's cache.
+
+    Parameters
+    ----------
+    media_path: str
+        Directory containing the uploaded media.
+    max_size: int
+        If positive, images larger than this many bytes are encoded again to fit.
+    format: str
+        Image format used when recompressing, one of WEBP, JPEG or PNG.
+    """
+
+    def __init__(
+        self, media_path: str = "./admin_panel/media/", max_size: int = 0, format: str = "WEBP"
+    ):
+        self.media_path = media_path
+        self.max_size = max_size
+        self.format = format
+        self.assets: dict[str, SpawnAsset] = {}
+
+    @property
+    def size(self) -> int:
+        return sum(len(x.data) for x in self.assets.values())
+
+    def _load_one(self, path: str, previous: SpawnAsset | None) -> SpawnAsset:
+        stat = os.stat(self.media_path + path)
+        if previous and previous.mtime == stat.st_mtime_ns and previous.file_size == stat.st_size:
+            return previous
+        with open(self.media_path + path, "rb") as file:
+            data = file.read()
+        extension = path.split(".")[-1]
+        if self.max_size > 0 and len(data) > self.max_size:
+            try:
+                if result := recompress(data, self.max_size, self.format):
+                    data, extension = result
+            except Exception:
+                log.warning(f"Failed to recompress spawn image {path}", exc_info=True)
+        return SpawnAsset(data, extension, stat.st_mtime_ns, stat.st_size)
+
+    def load(self, balls: "Iterable[Ball]"):
+        """
+        Load the spawn images of the given countryballs, replacing the previous content.
+        Unchanged files are not read again. This is blocking, run it in a thread.
+        """
+        assets: dict[str, SpawnAsset] = {}
+        for ball in balls:
+            if not ball.wild_card or ball.wild_card in assets:
+                continue
+            try:
+                assets[ball.wild_card] = self._load_one(
+                    ball.wild_card, self.assets.get(ball.wild_card)
+                )
+            except OSError:
+                log.warning(f"Could not load the spawn image of {ball.country}", exc_info=True)
+        self.assets = assets
+
+    def get_file(self, wild_card: str, name: str) -> discord.File:
+        """
+        Return a `discord.File` with the spawn image. The buffer shares memory with the store,
+        nothing is copied. Files missing from the store are read from disk.
+
+        Parameters
+        ----------
+        wild_card: str
+            The `wild_card` attribute of the countryball.
+        name: str
+            Name of the attachment, without the extension.
+        """
+        if asset := self.assets.get(wild_card):
+            # BytesIO only copies the bytes when written to
+            return discord.File(BytesIO(asset.data), filename=f"{name}.{asset.extension}")
+        extension = wild_card.split(".")[-1]
+        return discord.File(self.media_path + wild_card, filename=f"{name}.{extension}")
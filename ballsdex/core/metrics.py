@@ -16,6 +16,42 @@ log = logging.getLogger("ballsdex.core.metrics")
 caught_balls = Counter(
     "caught_cb", "Caught countryballs", ["country", "special", "guild_size", "spawn_algo"]
 )
+render_queue_wait = Histogram(
+    "card_render_queue_wait", "Time spent by cards waiting for a free rendering process"
+)
+render_duration = Histogram("card_render_duration", "Time spent rendering and encoding a card")
+render_rejected = Counter(
+    "card_render_rejected", "Card renders rejected because the rendering queue was full"
+)
+asset_cache_hits = Counter("card_asset_cache_hits", "Decoded card assets found in cache")
+asset_cache_misses = Counter("card_asset_cache_misses", "Card assets decoded from disk")
+asset_cache_evicted_bytes = Counter(
+    "card_asset_cache_evicted_bytes", "Bytes of decoded card assets evicted from cache"
+)
+asset_cache_size = Gauge(
+    "card_asset_cache_bytes", "Memory used by decoded card assets", ["worker"]
+)
+spawn_tracked_guilds = Gauge("spawn_tracked_guilds", "Guilds with a spawn state in memory")
+spawn_state_bytes = Gauge("spawn_state_bytes", "Approximate memory used by the spawn states")
+spawn_queue_depth = Gauge("spawn_queue_depth", "Spawns waiting to be sent")
+spawn_dispatch_latency = Histogram(
+    "spawn_dispatch_latency", "Time between the decision to spawn and the spawn message sent"
+)
+spawn_dispatch_dropped = Counter(
+    "spawn_dispatch_dropped",
+    "Spawns dropped before being sent, by reason (coalesced or queue_full)",
+    ["reason"],
+)
+attachment_cache_requests = Counter(
+    "attachment_cache_requests",
+    "Lookups of previously uploaded attachments, by result (hit or miss)",
+    ["result"],
+)
+player_cache_requests = Counter(
+    "player_cache_requests",
+    "Lookups of players by Discord ID, by result (hit or miss)",
+    ["result"],
+)
 
 
 class PrometheusServer:
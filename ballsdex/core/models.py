@@ -1,18 +1,26 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from enum import IntEnum
 from io import BytesIO
-from typing import TYPE_CHECKING, Iterable, Tuple, Type
+from typing import TYPE_CHECKING, Any, BinaryIO, Iterable, Tuple, Type
 
 import discord
+from cachetools import TTLCache
 from discord.utils import format_dt
 from tortoise import exceptions, fields, models, signals, timezone, validators
 from tortoise.contrib.postgres.indexes import PostgreSQLIndex
-from tortoise.expressions import Q
-
-from ballsdex.core.image_generator.image_gen import draw_card
+from tortoise.expressions import F, Q
+
+from ballsdex.core.image_generator.image_gen import (
+    CardEncoding,
+    CardSpec,
+    card_cache_key,
+    render_card,
+)
+from ballsdex.core.image_generator.render_cache import get_render_cache
+from ballsdex.core.metrics import player_cache_requests
+from ballsdex.core.utils.formatting import normalize_name
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -25,6 +33,8 @@ balls: dict[int, Ball] = {}
 regimes: dict[int, Regime] = {}
 economies: dict[int, Economy] = {}
 specials: dict[int, Special] = {}
+# normalized names accepted when catching each ball
+ball_catch_names: dict[int, frozenset[str]] = {}
 
 
 async def lower_catch_names(
@@ -52,6 +62,17 @@ async def lower_translations(
             [x.strip() for x in instance.translations.split(";")]
         ).lower()
 
+
+async def index_catch_names(
+    model: Type[Ball],
+    instance: Ball,
+    created: bool,
+    using_db: "BaseDBAsyncClient | None" = None,
+    update_fields: Iterable[str] | None = None,
+):
+    ball_catch_names[instance.pk] = instance.normalized_names()
+
+
 async def check_create_itemsinstance(
     model: Type[ItemsInstance],
     instance: ItemsInstance,
@@ -63,6 +84,29 @@ async def check_create_itemsinstance(
     if not instance.item.can_register:
         raise ValueError("Item must be registered before purchase.")
 
+
+async def cache_player(
+    model: Type[Player],
+    instance: Player,
+    created: bool,
+    using_db: "BaseDBAsyncClient | None" = None,
+    update_fields: Iterable[str] | None = None,
+):
+    # after a partial save, the other fields of the instance may not match the database
+    if update_fields or instance._partial:
+        player_cache.invalidate(instance.discord_id)
+    else:
+        player_cache.put(instance)
+
+
+async def uncache_player(
+    model: Type[Player],
+    instance: Player,
+    using_db: "BaseDBAsyncClient | None" = None,
+):
+    player_cache.invalidate(instance.discord_id)
+
+
 class DiscordSnowflakeValidator(validators.Validator):
     def __call__(self, value: int):
         if not 17 <= len(str(value)) <= 19:
@@ -211,9 +255,29 @@ class Ball(models.Model):
     def cached_economy(self) -> Economy | None:
         return economies.get(self.economy_id, self.economy)
 
+    @property
+    def cached_catch_names(self) -> frozenset[str]:
+        names = ball_catch_names.get(self.pk)
+        if names is None:
+            names = ball_catch_names[self.pk] = self.normalized_names()
+        return names
+
+    def normalized_names(self) -> frozenset[str]:
+        """
+        Return all the names accepted when catching this ball (the country, catch names and
+        translations), normalized with `normalize_name`.
+        """
+        names = [self.country]
+        if self.catch_names:
+            names.extend(self.catch_names.split(";"))
+        if self.translations:
+            names.extend(self.translations.split(";"))
+        return frozenset(x for x in map(normalize_name, names) if x)
+
 
 Ball.register_listener(signals.Signals.pre_save, lower_catch_names)
 Ball.register_listener(signals.Signals.pre_save, lower_translations)
+Ball.register_listener(signals.Signals.post_save, index_catch_names)
 
 
 class BallInstance(models.Model):
@@ -230,6 +294,11 @@ class BallInstance(models.Model):
     server_id = fields.BigIntField(
         description="Discord server ID where this ball was caught", null=True
     )
+    spawn_id = fields.BigIntField(
+        description="Discord message ID of the spawn this ball was caught from",
+        null=True,
+        unique=True,
+    )
     special: fields.ForeignKeyRelation[Special] | None = fields.ForeignKeyField(
         "models.Special", null=True, default=None, on_delete=fields.SET_NULL
     )
@@ -344,16 +413,29 @@ class BallInstance(models.Model):
                     text = f"{emoji} {text}"
         return text
 
-    def draw_card(self) -> BytesIO:
-        image, kwargs = draw_card(self)
+    def draw_card(self, encoding: CardEncoding | None = None) -> BinaryIO:
+        """
+        Render the card in the current thread, using the render cache. This blocks on disk
+        I/O and rendering: from async code, use the bot's `render_service` instead.
+        """
+        card = CardSpec.from_instance(self)
+        encoding = encoding or CardEncoding.from_settings()
+        cache = get_render_cache()
+        if cache:
+            key = card_cache_key(card, encoding=encoding)
+            if file := cache.open(key):
+                return file
+        image, kwargs = render_card(card, encoding=encoding, cache=cache)
         buffer = BytesIO()
         image.save(buffer, **kwargs)
         buffer.seek(0)
         image.close()
+        if cache:
+            cache.put(key, buffer.getvalue())
         return buffer
 
     async def prepare_for_message(
-        self, interaction: discord.Interaction["BallsDexBot"]
+        self, interaction: discord.Interaction["BallsDexBot"], thumbnail: bool = False
     ) -> Tuple[str, discord.File, discord.ui.View]:
         # message content
         trade_content = ""
@@ -391,11 +473,11 @@ class BallInstance(models.Model):
         )
 
         # draw image
-        with ThreadPoolExecutor() as pool:
-            buffer = await interaction.client.loop.run_in_executor(pool, self.draw_card)
+        encoding = CardEncoding.from_settings(thumbnail=thumbnail)
+        buffer = await interaction.client.render_service.render(self, encoding)
 
         view = discord.ui.View()
-        return content, discord.File(buffer, "card.webp"), view
+        return content, discord.File(buffer, f"card.{encoding.extension}"), view
 
     async def lock_for_trade(self):
         self.locked = timezone.now()
@@ -491,15 +573,29 @@ class Player(models.Model):
     async def add_money(self, amount: int) -> int:
         if amount <= 0:
             raise ValueError("Amount to add must be positive")
+        # the balance is updated in the database, this instance may come from the cache and
+        # have an outdated balance that must not overwrite the real one
+        await Player.filter(pk=self.pk).update(money=F("money") + amount)
+        player_cache.invalidate(self.discord_id)
         self.money += amount
-        await self.save(update_fields=("money",))
         return self.money
 
     async def remove_money(self, amount: int) -> None:
-        if self.money < amount:
+        removed = await Player.filter(pk=self.pk, money__gte=amount).update(
+            money=F("money") - amount
+        )
+        player_cache.invalidate(self.discord_id)
+        if not removed:
             raise ValueError("Not enough money")
         self.money -= amount
-        await self.save(update_fields=("money",))
+
+    async def refresh_money(self) -> int:
+        """
+        Load the current balance from the database, as players from `player_cache` may have an
+        outdated one. Call this before showing the balance or checking `can_afford`.
+        """
+        self.money = await Player.get(pk=self.pk).values_list("money", flat=True)
+        return self.money
 
     def can_afford(self, amount: int) -> bool:
         return self.money >= amount
@@ -522,6 +618,80 @@ class Player(models.Model):
         return self.cooldown is not None and (self.cooldown + timedelta(days=1)) > timezone.now()
 
 
+class PlayerCache:
+    """
+    Bounded cache of the players by Discord ID, sparing the query that starts most commands.
+
+    Entries are compact tuples of the column values, and a new `Player` instance is built from
+    them on each lookup, so that commands never share an instance. A full save of a player
+    replaces its entry (write-through), while partial saves and balance updates drop it, to be
+    loaded again by the next lookup. Changes made by other processes, like the admin panel, are
+    seen once the entry expires, so the balance must be read again with `Player.refresh_money`
+    before being shown or checked.
+
+    Parameters
+    ----------
+    maxsize: int
+        Maximum number of players cached, the least recently used are evicted first.
+    ttl: float
+        Number of seconds after which a player is loaded again from the database.
+    """
+
+    def __init__(self, maxsize: int = 50000, ttl: float = 300):
+        self.records: TTLCache[int, tuple[Any, ...]] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def put(self, player: Player):
+        meta = player._meta
+        self.records[player.discord_id] = tuple(
+            meta.fields_map[field].to_db_value(getattr(player, field), player)
+            for field in meta.fields_db_projection
+        )
+
+    def invalidate(self, discord_id: int):
+        self.records.pop(discord_id, None)
+
+    def clear(self):
+        self.records.clear()
+
+    def get_cached(self, discord_id: int) -> Player | None:
+        """
+        Build a player from its cache entry, without querying the database.
+        """
+        record = self.records.get(discord_id)
+        if record is None:
+            player_cache_requests.labels(result="miss").inc()
+            return None
+        player_cache_requests.labels(result="hit").inc()
+        columns = Player._meta.fields_db_projection.values()
+        return Player._init_from_db(**dict(zip(columns, record)))
+
+    async def get_or_none(self, discord_id: int) -> Player | None:
+        """
+        Cached equivalent of `Player.get_or_none(discord_id=discord_id)`.
+        """
+        if player := self.get_cached(discord_id):
+            return player
+        player = await Player.get_or_none(discord_id=discord_id)
+        if player:
+            self.put(player)
+        return player
+
+    async def get_or_create(self, discord_id: int) -> tuple[Player, bool]:
+        """
+        Cached equivalent of `Player.get_or_create(discord_id=discord_id)`.
+        """
+        if player := self.get_cached(discord_id):
+            return player, False
+        player, created = await Player.get_or_create(discord_id=discord_id)
+        self.put(player)
+        return player, created
+
+
+player_cache = PlayerCache()
+Player.register_listener(signals.Signals.post_save, cache_player)
+Player.register_listener(signals.Signals.post_delete, uncache_player)
+
+
 class BlacklistedID(models.Model):
     discord_id = fields.BigIntField(
         description="Discord user ID", unique=True, validators=[DiscordSnowflakeValidator()]
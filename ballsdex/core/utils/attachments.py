@@ -0,0 +1,141 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, NamedTuple
+from urllib.parse import parse_qs, urlparse
+
+import discord
+
+from ballsdex.core.metrics import attachment_cache_requests
+
+log = logging.getLogger("ballsdex.core.utils.attachments")
+
+# URLs are not reused when they expire in less than this number of seconds
+EXPIRY_MARGIN = 3600
+# lifetime of URLs without an expiry timestamp
+DEFAULT_LIFETIME = 12 * 3600
+
+
+class _Entry(NamedTuple):
+    url: str
+    expires_at: float
+    message_id: int
+
+
+def get_expiry(url: str) -> float:
+    """
+    Return the timestamp at which a Discord CDN URL expires, read from its signed `ex`
+    parameter (hexadecimal UNIX time).
+    """
+    try:
+        return int(parse_qs(urlparse(url).query)["ex"][0], 16)
+    except (KeyError, IndexError, ValueError):
+        return time.time() + DEFAULT_LIFETIME
+
+
+def file_digest(file: discord.File) -> str:
+    """
+    Return the SHA-256 digest of the content of a `discord.File`, leaving it ready to be sent.
+    """
+    digest = hashlib.file_digest(file.fp, "sha256").hexdigest()  # type: ignore
+    file.reset()
+    return digest
+
+
+class AttachmentCache:
+    """
+    Remembers the CDN URL of files previously uploaded to Discord, keyed by the hash of their
+    content, to reference them in an embed instead of uploading the same bytes again.
+
+    Entries are dropped before their signed URL expires, or when the message holding the
+    attachment is deleted (see `forget_message`).
+
+    Parameters
+    ----------
+    max_entries: int
+        Maximum number of URLs remembered, least recently used first evicted.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._messages: dict[int, str] = {}
+
+    def get(self, digest: str) -> str | None:
+        entry = self._entries.get(digest)
+        if entry is None or entry.expires_at - EXPIRY_MARGIN < time.time():
+            if entry:
+                self.invalidate(digest)
+            attachment_cache_requests.labels(result="miss").inc()
+            return None
+        self._entries.move_to_end(digest)
+        attachment_cache_requests.labels(result="hit").inc()
+        return entry.url
+
+    def put(self, digest: str, message: discord.Message):
+        if not message.attachments or message.flags.ephemeral:
+            return
+        url = message.attachments[0].url
+        self.invalidate(digest)
+        self._entries[digest] = _Entry(url, get_expiry(url), message.id)
+        self._messages[message.id] = digest
+        while len(self._entries) > self.max_entries:
+            _, entry = self._entries.popitem(last=False)
+            self._messages.pop(entry.message_id, None)
+
+    def invalidate(self, digest: str):
+        if entry := self._entries.pop(digest, None):
+            self._messages.pop(entry.message_id, None)
+
+    def forget_message(self, message_id: int):
+        """
+        Invalidate the URL uploaded with this message, since attachments are deleted with it.
+        """
+        if digest := self._messages.pop(message_id, None):
+            self._entries.pop(digest, None)
+
+    async def send(
+        self,
+        send: Callable[..., Awaitable[Any]],
+        file: discord.File,
+        *,
+        reuse: bool = True,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Send a file with the given function, reusing a previous upload of the same content if
+        possible. If sending the cached URL fails, the file is uploaded instead.
+
+        Parameters
+        ----------
+        send: Callable[..., Awaitable[discord.Message]]
+            The function sending the message, such as `TextChannel.send` or
+            `Interaction.followup.send`.
+        file: discord.File
+            The file to send.
+        reuse: bool
+            If `False`, the file is always uploaded, and not remembered.
+        **kwargs
+            Other arguments passed to `send`.
+
+        Returns
+        -------
+        discord.Message
+            The message returned by `send`.
+        """
+        if not reuse:
+            return await send(file=file, **kwargs)
+        digest = file_digest(file)
+        if url := self.get(digest):
+            embed = discord.Embed()
+            embed.set_image(url=url)
+            try:
+                return await send(embed=embed, **kwargs)
+            except discord.HTTPException:
+                log.warning("Failed to send a cached attachment, uploading it", exc_info=True)
+                self.invalidate(digest)
+        message = await send(file=file, **kwargs)
+        if isinstance(message, discord.Message):
+            self.put(digest, message)
+        return message
@@ -0,0 +1,204 @@
+"""
+Cache of the countryballs owned by each player, as bitsets.
+
+A bitset is an integer where the bit `n` is set when the player owns at least one instance of
+the ball with the primary key `n`. Completion, comparisons and first catch checks then become
+bit operations instead of `DISTINCT ball_id` queries.
+
+Saved instances are added to the cached bitsets and deleted ones drop the bitset of their owner,
+through signal listeners. Anything else removing a countryball from a player (transfers, bulk
+deletions) must drop its bitset with `owned_balls.discard`, to be loaded again from the
+database.
+"""
+
+from typing import TYPE_CHECKING, Iterable
+
+from cachetools import TTLCache
+from tortoise import signals
+
+from ballsdex.core.models import BallInstance, balls
+
+if TYPE_CHECKING:
+    from tortoise.backends.base.client import BaseDBAsyncClient
+
+
+def to_bitset(ball_ids: Iterable[int]) -> int:
+    bitset = 0
+    for ball_id in ball_ids:
+        bitset |= 1 << ball_id
+    return bitset
+
+
+def ball_ids(bitset: int) -> set[int]:
+    """
+    Return the primary keys of the balls set in the bitset.
+    """
+    ids: set[int] = set()
+    while bitset:
+        lowest = bitset & -bitset
+        ids.add(lowest.bit_length() - 1)
+        bitset ^= lowest
+    return ids
+
+
+def enabled_bitset() -> int:
+    """
+    Return the bitset of all enabled balls, to mask the ones that do not count toward
+    completion.
+    """
+    return to_bitset(pk for pk, ball in balls.items() if ball.enabled)
+
+
+class OwnedBalls:
+    """
+    Bounded cache of the owned balls bitsets, by player primary key.
+
+    Parameters
+    ----------
+    maxsize: int
+        Maximum number of players cached, the least recently used are evicted first.
+    ttl: float
+        Number of seconds after which a bitset is loaded again from the database. This bounds
+        how long changes made outside of the bot (like the admin panel) are missed.
+    """
+
+    def __init__(self, maxsize: int = 50000, ttl: float = 3600):
+        self.bitsets: TTLCache[int, int] = TTLCache(maxsize=maxsize, ttl=ttl)
+        # bits added while a bitset is being loaded, None if it was discarded meanwhile
+        self.loading: dict[int, int | None] = {}
+
+    async def load(self, player_id: int) -> int:
+        self.loading[player_id] = 0
+        try:
+            ids = (
+                await BallInstance.filter(player_id=player_id)
+                .distinct()
+                .values_list("ball_id", flat=True)
+            )
+        finally:
+            added = self.loading.pop(player_id, None)
+        bitset = to_bitset(ids)  # type: ignore
+        if added is not None:
+            bitset |= added
+            self.bitsets[player_id] = bitset
+        return bitset
+
+    async def get(self, player_id: int) -> int:
+        """
+        Return the bitset of the balls owned by a player, loading it if needed.
+        """
+        bitset = self.bitsets.get(player_id)
+        if bitset is None:
+            bitset = await self.load(player_id)
+        return bitset
+
+    async def owns(self, player_id: int, ball_id: int) -> bool:
+        return bool(await self.get(player_id) >> ball_id & 1)
+
+    def add(self, player_id: int, ball_id: int):
+        """
+        Mark a ball as owned by a player. Nothing is done if the bitset is not cached, it will
+        be complete once loaded.
+        """
+        if (bitset := self.bitsets.get(player_id)) is not None:
+            self.bitsets[player_id] = bitset | 1 << ball_id
+        if (added := self.loading.get(player_id)) is not None:
+            self.loading[player_id] = added | 1 << ball_id
+
+    def discard(self, player_id: int):
+        """
+        Drop the bitset of a player, after a countryball was removed from them.
+        """
+        self.bitsets.pop(player_id, None)
+        if player_id in self.loading:
+            self.loading[player_id] = None
+
+    def clear(self):
+        self.bitsets.clear()
+        for player_id in self.loading:
+            self.loading[player_id] = None
+
+    async def check(self, player_ids: Iterable[int] | None = None) -> dict[int, tuple[int, int]]:
+        """
+        Compare the cached bitsets with the database, in a single query.
+
+        Parameters
+        ----------
+        player_ids: Iterable[int] | None
+            The players to check, if not all the cached ones. Players that are not cached are
+            ignored.
+
+        Returns
+        -------
+        dict[int, tuple[int, int]]
+            The players whose bitset is wrong, with the bitsets of the balls missing from the
+            cache and of the balls wrongly marked as owned.
+        """
+        if player_ids is None:
+            cached = dict(self.bitsets.items())
+        else:
+            cached = {x: y for x in player_ids if (y := self.bitsets.get(x)) is not None}
+        if not cached:
+            return {}
+        actual = dict.fromkeys(cached, 0)
+        for player_id, ball_id in await (
+            BallInstance.filter(player_id__in=list(cached))
+            .distinct()
+            .values_list("player_id", "ball_id")
+        ):
+            actual[player_id] |= 1 << ball_id  # type: ignore
+        errors: dict[int, tuple[int, int]] = {}
+        for player_id, bitset in cached.items():
+            # bits added since the snapshot of the cache are not errors
+            current = self.bitsets.get(player_id, bitset)
+            if bitset != actual[player_id] and current != actual[player_id]:
+                errors[player_id] = (actual[player_id] & ~bitset, bitset & ~actual[player_id])
+        return errors
+
+    async def rebuild(self, player_ids: Iterable[int] | None = None) -> int:
+        """
+        Reload bitsets from the database, returning the number of bitsets reloaded.
+
+        Parameters
+        ----------
+        player_ids: Iterable[int] | None
+            The players to reload. If omitted, the whole cache is dropped and bitsets will be
+            loaded again on their next use.
+        """
+        if player_ids is None:
+            count = len(self.bitsets)
+            self.clear()
+            return count
+        player_ids = list(player_ids)
+        for player_id in player_ids:
+            self.discard(player_id)
+        for player_id in player_ids:
+            await self.load(player_id)
+        return len(player_ids)
+
+
+owned_balls = OwnedBalls()
+
+
+async def cache_owned_ball(
+    model: type[BallInstance],
+    instance: BallInstance,
+    created: bool,
+    using_db: "BaseDBAsyncClient | None" = None,
+    update_fields: Iterable[str] | None = None,
+):
+    if (player_id := getattr(instance, "player_id", None)) is not None:
+        owned_balls.add(player_id, instance.ball_id)
+
+
+async def uncache_owned_ball(
+    model: type[BallInstance],
+    instance: BallInstance,
+    using_db: "BaseDBAsyncClient | None" = None,
+):
+    if (player_id := getattr(instance, "player_id", None)) is not None:
+        owned_balls.discard(player_id)
+
+
+BallInstance.register_listener(signals.Signals.post_save, cache_owned_ball)
+BallInstance.register_listener(signals.Signals.post_delete, uncache_owned_ball)
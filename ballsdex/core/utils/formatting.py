@@ -1,3 +1,4 @@
+import unicodedata
 from typing import Iterator, Sequence
 
 import discord
@@ -48,3 +49,46 @@ def escape(text: str, *, mass_mentions: bool = False, formatting: bool = False)
     if formatting:
         text = discord.utils.escape_markdown(text)
     return text
+
+
+# typographic variants of quotes and apostrophes that phone keyboards like to insert
+QUOTES_TABLE = str.maketrans(
+    {
+        "\u2018": "'",
+        "\u2019": "'",
+        "\u201a": "'",
+        "\u201b": "'",
+        "\u2032": "'",
+        "\u00b4": "'",
+        "`": "'",
+        "\u201c": '"',
+        "\u201d": '"',
+        "\u201e": '"',
+        "\u201f": '"',
+        "\u2033": '"',
+        "\u00ab": '"',
+        "\u00bb": '"',
+    }
+)
+
+
+def normalize_name(text: str) -> str:
+    """
+    Normalize a name for loose comparison: compatibility characters are replaced (NFKC),
+    accents are removed, case is folded, quotes are replaced by their ASCII equivalent and
+    blank characters are collapsed into single spaces.
+
+    Parameters
+    ----------
+    text: str
+        The text to normalize.
+
+    Returns
+    -------
+    str
+        The normalized text, compare it with other normalized texts only.
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(x for x in text if not unicodedata.combining(x))
+    text = unicodedata.normalize("NFKC", text.casefold()).translate(QUOTES_TABLE)
+    return " ".join(text.split())
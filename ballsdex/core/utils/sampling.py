@@ -0,0 +1,160 @@
+import random
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Generic, Iterable, Sequence, TypeVar
+
+if TYPE_CHECKING:
+    from ballsdex.core.models import Special
+
+T = TypeVar("T")
+
+# end dates are inclusive, the interval after them starts one tick later
+END_DATE_MARGIN = timedelta(microseconds=1)
+
+
+class AliasTable(Generic[T]):
+    """
+    Weighted random selection in constant time, using Vose's alias method.
+
+    Building the table is linear in the number of items, then each draw only costs one call to
+    `random.random` and two list lookups, without allocating anything. Build it once when the
+    weights change, instead of calling `random.choices` with the full weight list every time.
+
+    Items with a weight of 0 or less are never drawn.
+
+    Parameters
+    ----------
+    items: Iterable[T]
+        The items to draw.
+    weights: Iterable[float]
+        The relative weight of each item, in the same order.
+    """
+
+    __slots__ = ("items", "_probabilities", "_aliases")
+
+    def __init__(self, items: Iterable[T], weights: Iterable[float]):
+        population = [(item, weight) for item, weight in zip(items, weights) if weight > 0]
+        self.items: list[T] = [x[0] for x in population]
+        size = len(population)
+        total = sum(x[1] for x in population)
+        scaled = [x[1] * size / total for x in population]
+        self._probabilities = [1.0] * size
+        self._aliases = list(range(size))
+
+        small = [i for i, x in enumerate(scaled) if x < 1]
+        large = [i for i, x in enumerate(scaled) if x >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probabilities[less] = scaled[less]
+            self._aliases[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1
+            (small if scaled[more] < 1 else large).append(more)
+        # leftovers are 1 with rounding errors, their default probability and alias are correct
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def draw(self) -> T:
+        """
+        Draw a random item, according to the weights.
+
+        Raises
+        ------
+        IndexError
+            The table is empty.
+        """
+        if not self.items:
+            raise IndexError("Cannot draw from an empty table")
+        # the integer part picks a column, the fractional part decides between it and its alias
+        x = random.random() * len(self.items)
+        i = int(x)
+        if x - i < self._probabilities[i]:
+            return self.items[i]
+        return self.items[self._aliases[i]]
+
+    def sample(self, k: int) -> Sequence[T]:
+        """
+        Draw `k` random items, with replacement, according to the weights.
+
+        Raises
+        ------
+        IndexError
+            The table is empty.
+        """
+        if k > 0 and not self.items:
+            raise IndexError("Cannot draw from an empty table")
+        items, probabilities, aliases = self.items, self._probabilities, self._aliases
+        size = len(items)
+        result: list[T] = []
+        for _ in range(k):
+            x = random.random() * size
+            i = int(x)
+            result.append(items[i] if x - i < probabilities[i] else items[aliases[i]])
+        return result
+
+
+class SpecialSchedule:
+    """
+    Index of the specials active at any time, to roll the special of a catch without scanning
+    every event.
+
+    The start and end dates of all specials split the timeline into intervals during which the
+    set of active specials does not change. The population and its alias table are computed for
+    each interval on creation, a roll then bisects the current interval and draws from its
+    table. Rebuild the schedule when specials are modified.
+
+    Parameters
+    ----------
+    specials: Iterable[Special]
+        All the specials, active or not. A null start or end date is unbounded.
+    """
+
+    __slots__ = ("_boundaries", "_tables")
+
+    def __init__(self, specials: Iterable["Special"]):
+        specials = list(specials)
+        boundaries: set[datetime] = set()
+        for special in specials:
+            if special.start_date:
+                boundaries.add(special.start_date)
+            if special.end_date:
+                boundaries.add(special.end_date + END_DATE_MARGIN)
+        self._boundaries = sorted(boundaries)
+
+        self._tables: list[AliasTable["Special | None"] | None] = []
+        for i in range(len(self._boundaries) + 1):
+            # the set is constant over the interval, checking its start is enough
+            start = self._boundaries[i - 1] if i else None
+            population = [x for x in specials if self._is_active(x, start)]
+            if not population:
+                self._tables.append(None)
+                continue
+            # None represents the common countryball
+            common_weight = max(0, 1 - sum(x.rarity for x in population))
+            self._tables.append(
+                AliasTable([*population, None], [*(x.rarity for x in population), common_weight])
+            )
+
+    @staticmethod
+    def _is_active(special: "Special", time: datetime | None) -> bool:
+        if time is None:
+            # first interval, unbounded on the left
+            return special.start_date is None
+        return (special.start_date is None or special.start_date <= time) and (
+            special.end_date is None or time < special.end_date + END_DATE_MARGIN
+        )
+
+    def draw(self, now: datetime) -> "Special | None":
+        """
+        Roll the special of a countryball caught at the given time, according to the rarity of
+        the active specials.
+
+        Returns
+        -------
+        Special | None
+            The special drawn, or `None` for a common countryball.
+        """
+        table = self._tables[bisect_right(self._boundaries, now)]
+        if not table:
+            return None
+        return table.draw()
@@ -13,6 +13,7 @@ from tortoise.exceptions import BaseORMException, DoesNotExist
 from ballsdex.core.bot import BallsDexBot
 from ballsdex.core.models import Ball, BallInstance, Player, Special, Trade, TradeObject
 from ballsdex.core.utils.buttons import ConfirmChoiceView
+from ballsdex.core.utils.completion import owned_balls
 from ballsdex.core.utils.logging import log_action
 from ballsdex.core.utils.transformers import (
     BallTransform,
@@ -79,11 +80,14 @@ class Balls(app_commands.Group):
         )
         task = interaction.client.loop.create_task(update_message_loop())
         try:
-            for i in range(n):
-                if not countryball:
-                    ball = await countryball_cls.get_random(interaction.client)
-                else:
-                    ball = countryball_cls(interaction.client, countryball)
+            if countryball:
+                models = [countryball] * n
+            elif interaction.client.ball_table:
+                models = interaction.client.ball_table.sample(n)
+            else:
+                raise RuntimeError("No ball to spawn")
+            for model in models:
+                ball = countryball_cls(interaction.client, model)
                 ball.special = special
                 ball.atk_bonus = atk_bonus
                 ball.hp_bonus = hp_bonus
@@ -387,6 +391,7 @@ class Balls(app_commands.Group):
         player, _ = await Player.get_or_create(discord_id=user.id)
         ball.player = player
         await ball.save()
+        owned_balls.discard(original_player.pk)
 
         trade = await Trade.create(player1=original_player, player2=player)
         await TradeObject.create(trade=trade, ballinstance=ball, player=original_player)
@@ -458,6 +463,7 @@ class Balls(app_commands.Group):
             count = len(to_delete)
         else:
             count = await BallInstance.filter(player=player).delete()
+            owned_balls.discard(player.pk)
         await interaction.followup.send(
             f"{count} {settings.plural_collectible_name} from {user} have been deleted.",
             ephemeral=True,
@@ -513,6 +519,93 @@ class Balls(app_commands.Group):
                 f"{country}{settings.collectible_name}{plural}."
             )
 
+    @app_commands.command(name="completion-check")
+    @app_commands.checks.has_any_role(*settings.root_role_ids)
+    async def balls_completion_check(
+        self, interaction: discord.Interaction[BallsDexBot], user: discord.User | None = None
+    ):
+        """
+        Check the cached completions against the database and reload the wrong ones.
+
+        Parameters
+        ----------
+        user: discord.User | None
+            The user you want to check, if not all the players currently cached.
+        """
+        player_ids = None
+        if user:
+            player = await Player.get_or_none(discord_id=user.id)
+            if not player:
+                await interaction.response.send_message(
+                    "The user you gave does not exist.", ephemeral=True
+                )
+                return
+            if player.pk not in owned_balls.bitsets:
+                await interaction.response.send_message(
+                    f"The completion of {user} is not cached.", ephemeral=True
+                )
+                return
+            player_ids = [player.pk]
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        errors = await owned_balls.check(player_ids)
+        if not errors:
+            checked = user or f"{len(owned_balls.bitsets)} cached players"
+            await interaction.followup.send(f"No inconsistency found for {checked}.")
+            return
+
+        await owned_balls.rebuild(errors)
+        lines = []
+        for player_id, (missing, extra) in list(errors.items())[:10]:
+            log.warning(
+                f"Wrong completion cache for player {player_id}: {missing.bit_count()} "
+                f"{settings.plural_collectible_name} missing, {extra.bit_count()} not owned"
+            )
+            lines.append(
+                f"- Player {player_id}: {missing.bit_count()} missing, "
+                f"{extra.bit_count()} not owned"
+            )
+        if len(errors) > len(lines):
+            lines.append(f"- and {len(errors) - len(lines)} more")
+        await interaction.followup.send(
+            f"{len(errors)} cached completions were wrong and have been reloaded.\n"
+            + "\n".join(lines)
+        )
+
+    @app_commands.command(name="completion-rebuild")
+    @app_commands.checks.has_any_role(*settings.root_role_ids)
+    async def balls_completion_rebuild(
+        self, interaction: discord.Interaction[BallsDexBot], user: discord.User | None = None
+    ):
+        """
+        Reload the cached completions from the database.
+
+        Parameters
+        ----------
+        user: discord.User | None
+            The user you want to reload, if not everyone.
+        """
+        if user:
+            player = await Player.get_or_none(discord_id=user.id)
+            if not player:
+                await interaction.response.send_message(
+                    "The user you gave does not exist.", ephemeral=True
+                )
+                return
+            await owned_balls.rebuild([player.pk])
+            await interaction.response.send_message(
+                f"The completion of {user} has been reloaded.", ephemeral=True
+            )
+        else:
+            count = await owned_balls.rebuild()
+            await interaction.response.send_message(
+                f"{count} cached completions dropped, they will be reloaded on their next use.",
+                ephemeral=True,
+            )
+        await log_action(
+            f"{interaction.user} rebuilt the completion cache of {user or 'everyone'}.",
+            interaction.client,
+        )
+
     @app_commands.command(name="create")
     @app_commands.checks.has_any_role(*settings.root_role_ids)
     async def balls_create(
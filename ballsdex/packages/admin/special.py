@@ -374,7 +374,8 @@ class Special(app_commands.Group):
 
             instance = random.choice(await BallInstance.all().filter(special=special))
 
-            file = discord.File(instance.draw_card(), filename=file_name)
+            buffer = await interaction.client.render_service.render(instance)
+            file = discord.File(buffer, filename=file_name)
 
             files.append(file)
 
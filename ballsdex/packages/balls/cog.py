@@ -5,8 +5,9 @@ from typing import TYPE_CHECKING, cast
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ui import Button, View, button
+from discord.utils import format_dt
 from tortoise.exceptions import DoesNotExist
 from tortoise.functions import Count
 
@@ -18,8 +19,10 @@ from ballsdex.core.models import (
     Trade,
     TradeObject,
     balls,
+    player_cache,
 )
 from ballsdex.core.utils.buttons import ConfirmChoiceView
+from ballsdex.core.utils.completion import ball_ids, owned_balls, to_bitset
 from ballsdex.core.utils.paginator import FieldPageSource, Pages
 from ballsdex.core.utils.sorting import FilteringChoices, SortingChoices, filter_balls, sort_balls
 from ballsdex.core.utils.transformers import (
@@ -30,6 +33,7 @@ from ballsdex.core.utils.transformers import (
 )
 from ballsdex.core.utils.utils import inventory_privacy, is_staff
 from ballsdex.packages.balls.countryballs_paginator import CountryballsViewer, DuplicateViewMenu
+from ballsdex.packages.balls.leaderboard import LeaderboardCache, fetch_ranking
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -82,6 +86,7 @@ class DonationRequest(View):
         self.countryball.trade_player = self.countryball.player
         self.countryball.player = self.new_player
         await self.countryball.save()
+        owned_balls.discard(self.countryball.trade_player.pk)
         trade = await Trade.create(player1=self.countryball.trade_player, player2=self.new_player)
         await TradeObject.create(
             trade=trade, ballinstance=self.countryball, player=self.countryball.trade_player
@@ -121,6 +126,21 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
 
     def __init__(self, bot: "BallsDexBot"):
         self.bot = bot
+        self.leaderboards = LeaderboardCache()
+
+    async def cog_load(self):
+        self.refresh_leaderboards.start()
+
+    async def cog_unload(self):
+        self.refresh_leaderboards.cancel()
+
+    @tasks.loop(minutes=10)
+    async def refresh_leaderboards(self):
+        try:
+            await self.leaderboards.refresh()
+        except Exception:
+            # keep serving the previous leaderboards, and keep the loop running
+            log.exception("Failed to refresh the leaderboards")
 
     @app_commands.command()
     @app_commands.checks.cooldown(1, 10, key=lambda i: i.user.id)
@@ -171,7 +191,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             if await inventory_privacy(self.bot, interaction, player, user_obj) is False:
                 return
 
-        interaction_player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        interaction_player, _ = await player_cache.get_or_create(interaction.user.id)
 
         blocked = await player.is_blocked(interaction_player)
         if blocked and not is_staff(interaction):
@@ -261,7 +281,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
                 )
                 return
 
-            interaction_player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+            interaction_player, _ = await player_cache.get_or_create(interaction.user.id)
 
             blocked = await player.is_blocked(interaction_player)
             if blocked and not is_staff(interaction):
@@ -298,12 +318,19 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             )
             return
 
-        owned_countryballs = set(
-            x[0]
-            for x in await BallInstance.filter(**filters)
-            .distinct()  # Do not query everything
-            .values_list("ball_id")
-        )
+        if special is None and self_caught is None:
+            # without filters, the owned countryballs come from the cached bitsets
+            if user is None:
+                player = await player_cache.get_or_none(user_obj.id)
+            bitset = await owned_balls.get(player.pk) if player else 0
+            owned_countryballs = ball_ids(bitset & to_bitset(bot_countryballs))
+        else:
+            owned_countryballs = set(
+                x[0]
+                for x in await BallInstance.filter(**filters)
+                .distinct()  # Do not query everything
+                .values_list("ball_id")
+            )
 
         entries: list[tuple[str, str]] = []
 
@@ -393,7 +420,13 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             return
         await interaction.response.defer(thinking=True)
         content, file, view = await countryball.prepare_for_message(interaction)
-        await interaction.followup.send(content=content, file=file, view=view)
+        await interaction.client.attachment_cache.send(
+            interaction.followup.send,
+            file,
+            reuse=settings.render_reuse_uploads,
+            content=content,
+            view=view,
+        )
         file.close()
 
     @app_commands.command()
@@ -425,7 +458,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             if await inventory_privacy(self.bot, interaction, player, user_obj) is False:
                 return
 
-        interaction_player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        interaction_player, _ = await player_cache.get_or_create(interaction.user.id)
 
         blocked = await player.is_blocked(interaction_player)
         if blocked and not is_staff(interaction):
@@ -451,7 +484,13 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
                 f"You are viewing {user.display_name}'s last caught {settings.collectible_name}.\n"
                 + content
             )
-        await interaction.followup.send(content=content, file=file, view=view)
+        await interaction.client.attachment_cache.send(
+            interaction.followup.send,
+            file,
+            reuse=settings.render_reuse_uploads,
+            content=content,
+            view=view,
+        )
         file.close()
 
     @app_commands.command()
@@ -577,7 +616,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         else:
             await interaction.response.defer()
         await countryball.lock_for_trade()
-        new_player, _ = await Player.get_or_create(discord_id=user.id)
+        new_player, _ = await player_cache.get_or_create(user.id)
         old_player = countryball.player
 
         if new_player == old_player:
@@ -630,6 +669,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         countryball.trade_player = old_player
         countryball.favorite = False
         await countryball.save()
+        owned_balls.discard(old_player.pk)
 
         trade = await Trade.create(player1=old_player, player2=new_player)
         await TradeObject.create(trade=trade, ballinstance=countryball, player=old_player)
@@ -717,7 +757,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         """
         await interaction.response.defer(thinking=True, ephemeral=True)
 
-        player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
         await player.fetch_related("balls")
         is_special = type == DuplicateType.specials
         queryset = BallInstance.filter(player=player)
@@ -803,8 +843,8 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
                 if y.enabled and (special.end_date is None or y.created_at < special.end_date)
             }
 
-        player1, _ = await Player.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await Player.get_or_create(discord_id=user.id)
+        player1, _ = await player_cache.get_or_create(interaction.user.id)
+        player2, _ = await player_cache.get_or_create(user.id)
 
         blocked = await player.is_blocked(player1)
         if blocked and not is_staff(interaction):
@@ -819,21 +859,30 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
                 "You cannot compare with a user that has you blocked.", ephemeral=True
             )
             return
-        queryset = BallInstance.filter(ball__enabled=True).distinct()
         if special:
-            queryset = queryset.filter(special=special)
-        user1_balls = cast(
-            list[int],
-            await queryset.filter(player=player1).values_list("ball_id", flat=True),
-        )
-        user2_balls = cast(
-            list[int],
-            await queryset.filter(player=player2).values_list("ball_id", flat=True),
-        )
-        both = set(user1_balls) & set(user2_balls)
-        user1_only = set(user1_balls) - set(user2_balls)
-        user2_only = set(user2_balls) - set(user1_balls)
-        neither = set(bot_countryballs.keys()) - both - user1_only - user2_only
+            queryset = BallInstance.filter(ball__enabled=True, special=special).distinct()
+            user1_balls = to_bitset(
+                cast(
+                    list[int],
+                    await queryset.filter(player=player1).values_list("ball_id", flat=True),
+                )
+            )
+            user2_balls = to_bitset(
+                cast(
+                    list[int],
+                    await queryset.filter(player=player2).values_list("ball_id", flat=True),
+                )
+            )
+        else:
+            user1_balls = await owned_balls.get(player1.pk)
+            user2_balls = await owned_balls.get(player2.pk)
+        all_balls = to_bitset(bot_countryballs)
+        user1_balls &= all_balls
+        user2_balls &= all_balls
+        both = ball_ids(user1_balls & user2_balls)
+        user1_only = ball_ids(user1_balls & ~user2_balls)
+        user2_only = ball_ids(user2_balls & ~user1_balls)
+        neither = ball_ids(all_balls & ~(user1_balls | user2_balls))
 
         entries = []
 
@@ -900,7 +949,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             Whether or not to send the command ephemerally.
         """
         await interaction.response.defer(thinking=True, ephemeral=ephemeral)
-        player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
 
         query = BallInstance.filter(player=player).prefetch_related(
             "player", "trade_player", "special"
@@ -959,26 +1008,21 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
 
     @app_commands.command(name="leaderboard", description="Look who are the first in the leaderboard")
     @app_commands.describe(countryball="Filter the leaderboard by a countryball.", special="Filter the leaderboard by a special.")
+    @app_commands.checks.cooldown(1, 10, key=lambda i: i.user.id)
     async def leaderboard(
         self, 
         interaction: discord.Interaction["BallsDexBot"],
         countryball: BallEnabledTransform | None = None,
         special: SpecialEnabledTransform | None = None
     ):
-        raw_players = await Player.all()
-
-        player_stats: list[tuple[Player, int]] = []
-        for player in raw_players:
-            queryset = player.balls.all()
-
-            if countryball:
-                queryset = queryset.filter(ball=countryball)
-            if special:
-                queryset = queryset.filter(special=special)
-
-            count = await queryset.count()
-            if count > 0:
-                player_stats.append((player, count))
+        ball_id = countryball.pk if countryball else None
+        special_id = special.pk if special else None
+        # combinations of a ball and a special are not materialized
+        ranking = None if ball_id and special_id else self.leaderboards.get(ball_id, special_id)
+        updated_at = self.leaderboards.updated_at
+        if ranking is None:
+            ranking = await fetch_ranking(ball_id, special_id)
+            updated_at = None
 
         ball_txt = countryball.country if countryball else ""
         special_txt = special if special else ""
@@ -992,21 +1036,13 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         else:
             combined = ""
 
-        if len(player_stats) == 0:
+        if not ranking.players:
             return await interaction.response.send_message(f"Players don't have any {settings.plural_collectible_name} {combined}", ephemeral=True)
 
-        sorted_stats = sorted(player_stats, key=lambda x: x[1], reverse=True)
-
         entries = []
 
-        total_count = 0
-        for top, stats in enumerate(sorted_stats, start=1):
-            player, count = stats
-
-            if count == 0:
-                continue
-
-            name = f"<@{str(player.discord_id)}>"
+        for top, (discord_id, count) in enumerate(ranking.players, start=1):
+            name = f"<@{discord_id}>"
     
             if top == 1:
                 name = f"🥇 {name}" 
@@ -1017,15 +1053,15 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             else:
                 name = f"{top}. {name}"
 
-            total_count += count
-
             entry = (f"User #{top}", f"{name}: **{count}** {settings.collectible_name}{'s' if count > 1 else ''}")
             entries.append(entry)
 
         per_page = 5 
         source = FieldPageSource(entries, per_page=per_page, inline=False, clear_description=False)
         source.embed.title = f"{settings.bot_name.capitalize()} Leaderboard{f" ({combined})" if len(str(combined)) > 0 else ''}" 
-        source.embed.description = f"-# Total: {total_count}"
+        source.embed.description = f"-# Total: {ranking.total}"
+        if updated_at:
+            source.embed.description += f"\n-# Last updated {format_dt(updated_at, 'R')}"
         source.embed.colour = discord.Colour.blurple()
         source.embed.set_author(
             name=interaction.user.display_name, icon_url=interaction.user.display_avatar.url
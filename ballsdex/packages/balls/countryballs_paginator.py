@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING, List
 
 import discord
 
+from ballsdex.core.image_generator.service import RendererBusy
 from ballsdex.core.models import BallInstance
 from ballsdex.core.utils import menus
 from ballsdex.core.utils.paginator import Pages
@@ -69,8 +70,23 @@ class CountryballsViewer(CountryballsSelector):
     async def ball_selected(
         self, interaction: discord.Interaction["BallsDexBot"], ball_instance: BallInstance
     ):
-        content, file, view = await ball_instance.prepare_for_message(interaction)
-        await interaction.followup.send(content=content, file=file, view=view)
+        try:
+            content, file, view = await ball_instance.prepare_for_message(
+                interaction, thumbnail=True
+            )
+        except RendererBusy:
+            await interaction.followup.send(
+                "The card renderer is busy at the moment, please try again in a few seconds.",
+                ephemeral=True,
+            )
+            return
+        await interaction.client.attachment_cache.send(
+            interaction.followup.send,
+            file,
+            reuse=settings.render_reuse_uploads,
+            content=content,
+            view=view,
+        )
         file.close()
 
 
@@ -0,0 +1,125 @@
+import logging
+from datetime import datetime
+from typing import NamedTuple
+
+from tortoise import Tortoise, timezone
+
+log = logging.getLogger("ballsdex.packages.balls.leaderboard")
+
+LEADERBOARD_SIZE = 100
+
+# Top players by number of countryballs, with the total of the filtered countryballs. The sum
+# is a window over all groups, so it is computed before the limit is applied.
+RANKING_QUERY = """
+SELECT player.discord_id, COUNT(*) AS count, SUM(COUNT(*)) OVER () AS total
+FROM ballinstance
+JOIN player ON player.id = ballinstance.player_id
+WHERE ($1::int IS NULL OR ballinstance.ball_id = $1)
+    AND ($2::int IS NULL OR ballinstance.special_id = $2)
+GROUP BY player.discord_id
+ORDER BY count DESC, player.discord_id
+LIMIT $3
+"""
+
+# All the rankings at once, in a single scan of the table: the global one (ball_id and
+# special_id both null), one per ball (special_id null) and one per special (ball_id null).
+# Countryballs without special are not a ranking of their own.
+ALL_RANKINGS_QUERY = """
+WITH counts AS (
+    SELECT
+        GROUPING(ball_id, special_id) AS grouped,
+        ball_id,
+        special_id,
+        player_id,
+        COUNT(*) AS count
+    FROM ballinstance
+    GROUP BY GROUPING SETS ((player_id), (ball_id, player_id), (special_id, player_id))
+),
+ranked AS (
+    SELECT
+        *,
+        SUM(count) OVER leaderboard AS total,
+        ROW_NUMBER() OVER (leaderboard ORDER BY count DESC, player_id) AS rank
+    FROM counts
+    WHERE grouped != 2 OR special_id IS NOT NULL
+    WINDOW leaderboard AS (PARTITION BY grouped, ball_id, special_id)
+)
+SELECT ranked.ball_id, ranked.special_id, player.discord_id, ranked.count, ranked.total
+FROM ranked
+JOIN player ON player.id = ranked.player_id
+WHERE ranked.rank <= $1
+ORDER BY ranked.rank
+"""
+
+
+class Ranking(NamedTuple):
+    # Discord IDs of the top players with their number of countryballs, in descending order
+    players: list[tuple[int, int]]
+    # number of countryballs owned by all players, not only the listed ones
+    total: int
+
+
+async def fetch_ranking(
+    ball_id: int | None = None, special_id: int | None = None, size: int = LEADERBOARD_SIZE
+) -> Ranking:
+    """
+    Query the top players by number of countryballs, with a single aggregate query.
+
+    Parameters
+    ----------
+    ball_id: int | None
+        Only count the countryballs of this ball.
+    special_id: int | None
+        Only count the countryballs of this special.
+    size: int
+        Number of players returned.
+    """
+    _, rows = await Tortoise.get_connection("default").execute_query(
+        RANKING_QUERY, [ball_id, special_id, size]
+    )
+    total = int(rows[0]["total"]) if rows else 0
+    return Ranking([(row["discord_id"], row["count"]) for row in rows], total)
+
+
+class LeaderboardCache:
+    """
+    Materialized leaderboards, global, per ball and per special, refreshed as a whole with
+    `refresh`.
+
+    Parameters
+    ----------
+    size: int
+        Number of players kept in each leaderboard.
+    """
+
+    def __init__(self, size: int = LEADERBOARD_SIZE):
+        self.size = size
+        self.rankings: dict[tuple[int | None, int | None], Ranking] = {}
+        self.updated_at: datetime | None = None
+
+    async def refresh(self):
+        _, rows = await Tortoise.get_connection("default").execute_query(
+            ALL_RANKINGS_QUERY, [self.size]
+        )
+        rankings: dict[tuple[int | None, int | None], Ranking] = {}
+        for row in rows:
+            key = (row["ball_id"], row["special_id"])
+            if (ranking := rankings.get(key)) is None:
+                ranking = rankings[key] = Ranking([], int(row["total"]))
+            ranking.players.append((row["discord_id"], row["count"]))
+        self.rankings = rankings
+        self.updated_at = timezone.now()
+        log.debug(f"Refreshed {len(rankings)} leaderboards")
+
+    def get(self, ball_id: int | None = None, special_id: int | None = None) -> Ranking | None:
+        """
+        Return a materialized leaderboard, filtered by ball or by special (not both).
+
+        Returns
+        -------
+        Ranking | None
+            The leaderboard, or `None` if the cache was never refreshed.
+        """
+        if self.updated_at is None:
+            return None
+        return self.rankings.get((ball_id, special_id), Ranking([], 0))
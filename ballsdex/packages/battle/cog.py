@@ -12,7 +12,7 @@ from ballsdex.core.utils.transformers import (
     BallInstanceTransform
 )
 
-from ballsdex.core.models import Player
+from ballsdex.core.models import player_cache
 from ballsdex.core.utils.buttons import ConfirmChoiceView
 from ballsdex.packages.battle.game import BattleGame
 from ballsdex.packages.battle.display import BattleTeam
@@ -131,8 +131,8 @@ class Battle(commands.GroupCog):
             )
             return
 
-        player1, _ = await Player.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await Player.get_or_create(discord_id=user.id)
+        player1, _ = await player_cache.get_or_create(interaction.user.id)
+        player2, _ = await player_cache.get_or_create(user.id)
         if player2.discord_id in self.bot.blacklist:
             await interaction.response.send_message(
                 "No puedes batallar con un usuario blacklisteado.", ephemeral=True
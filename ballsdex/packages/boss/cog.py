@@ -30,10 +30,10 @@ from ballsdex.core.models import (
     BlacklistedGuild,
     BlacklistedID,
     GuildConfig,
-    Player,
     Trade,
     TradeObject,
     balls,
+    player_cache,
     specials,
 )
 from .effects import *
@@ -99,7 +99,7 @@ class JoinButton(View):
 
     async def button_callback(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True, thinking=True)
-        player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
         if not self.boss_cog.boss_enabled:
             return await interaction.followup.send("Boss is disabled", ephemeral=True)
         if int(interaction.user.id) in self.boss_cog.disqualified:
@@ -222,16 +222,15 @@ class Boss(commands.GroupCog):
         def generate_random_name():
             source = string.ascii_uppercase + string.ascii_lowercase + string.ascii_letters
             return "".join(random.choices(source, k=15))
-        extension = self.bossball.wild_card.split(".")[-1]
-        file_location = "./admin_panel/media/" + self.bossball.wild_card
-        file_name = f"nt_{generate_random_name()}.{extension}"
         await interaction.followup.send(
             f"Round successfully started", ephemeral = True
         )
         if self.bosswilda[1] == 2: #if custom image
             file = await self.bosswilda[0].to_file()
         else:
-            file = discord.File(file_location, filename=file_name)
+            file = self.bot.spawn_assets.get_file(
+                self.bossball.wild_card, f"nt_{generate_random_name()}"
+            )
         await interaction.channel.send(
             (f"Round {self.round}\n# {self.bossball.country} is preparing to attack! {self.bot.get_emoji(self.bossball.emoji_id)}"),file=file
         )
@@ -259,16 +258,15 @@ class Boss(commands.GroupCog):
         def generate_random_name():
             source = string.ascii_uppercase + string.ascii_lowercase + string.ascii_letters
             return "".join(random.choices(source, k=15))
-        extension = self.bossball.wild_card.split(".")[-1]
-        file_location = "./admin_panel/media/" + self.bossball.wild_card
-        file_name = f"nt_{generate_random_name()}.{extension}"
         await interaction.followup.send(
             f"Round successfully started", ephemeral=True
         )
         if self.bosswildd[1] == 2: #if custom image
             file = await self.bosswildd[0].to_file()
         else:
-            file = discord.File(file_location, filename=file_name)
+            file = self.bot.spawn_assets.get_file(
+                self.bossball.wild_card, f"nt_{generate_random_name()}"
+            )
         await interaction.channel.send(
             (f"Round {self.round}\n# {self.bossball.country} is preparing to defend! {self.bot.get_emoji(self.bossball.emoji_id)}"),file=file
         )
@@ -641,7 +639,7 @@ class Boss(commands.GroupCog):
             self.lasthitter = 0
             return
         if winner != "None":
-            player, created = await Player.get_or_create(discord_id=bosswinner)
+            player, created = await player_cache.get_or_create(bosswinner)
             special = special = [x for x in specials.values() if x.name == "Boss"][0]
             instance = await BallInstance.create(
                 ball=self.bossball,
@@ -760,7 +758,7 @@ class Boss(commands.GroupCog):
 
         await interaction.response.defer(thinking=True, ephemeral=True)
         
-        player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
 
         await player.fetch_related("items")
 
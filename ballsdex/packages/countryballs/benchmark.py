@@ -0,0 +1,94 @@
+"""
+Micro-benchmark of the chatter statistics computed by `SpawnCooldown` for every message.
+
+Compares the previous implementation, scanning the whole message cache on each message, with
+the running counters maintained by `SpawnCooldown.cache_message`.
+
+Usage: python3 -m ballsdex.packages.countryballs.benchmark [-n 200000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import deque, namedtuple
+
+from rich.console import Console
+from rich.table import Table
+
+from ballsdex.packages.countryballs.spawn import WINDOW_SIZE, SpawnCooldown
+
+CachedMessage = namedtuple("CachedMessage", ["content", "author_id"])
+
+
+def scan_penalty(cache: deque[CachedMessage], message: CachedMessage) -> bool:
+    """
+    The previous implementation, rebuilding the set of authors and counting the messages of
+    the author on every message.
+    """
+    cache.append(message)
+    return len(set(x.author_id for x in cache)) < 4 or (
+        len(list(filter(lambda x: x.author_id == message.author_id, cache)))
+        / cache.maxlen  # type: ignore
+        > 0.4
+    )
+
+
+def counter_penalty(cooldown: SpawnCooldown, message: CachedMessage) -> bool:
+    cooldown.cache_message(message.author_id, len(message.content) < 5)
+    return (
+        len(cooldown.author_counts) < 4
+        or cooldown.author_counts[message.author_id] / WINDOW_SIZE > 0.4
+    )
+
+
+def generate_messages(count: int, authors: int) -> list[CachedMessage]:
+    return [
+        CachedMessage(
+            content="hi" if random.random() < 0.2 else "hello everyone",
+            author_id=random.randrange(authors),
+        )
+        for _ in range(count)
+    ]
+
+
+def main(arguments: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m ballsdex.packages.countryballs.benchmark",
+        description="Benchmark the per-message cost of the spawn chatter statistics",
+    )
+    parser.add_argument("-n", "--messages", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(arguments)
+    random.seed(args.seed)
+
+    table = Table(title="Chatter statistics per message")
+    table.add_column("Authors", justify="right", style="cyan")
+    table.add_column("Scan (ns)", justify="right")
+    table.add_column("Counters (ns)", justify="right")
+    table.add_column("Speedup", justify="right", style="green")
+
+    for authors in (1, 4, 20, 100):
+        messages = generate_messages(args.messages, authors)
+
+        cache: deque[CachedMessage] = deque(maxlen=WINDOW_SIZE)
+        t1 = time.perf_counter_ns()
+        expected = [scan_penalty(cache, x) for x in messages]
+        scan = (time.perf_counter_ns() - t1) / len(messages)
+
+        cooldown = SpawnCooldown(time.time())
+        t1 = time.perf_counter_ns()
+        results = [counter_penalty(cooldown, x) for x in messages]
+        counters = (time.perf_counter_ns() - t1) / len(messages)
+
+        if results != expected:
+            print(f"Results differ with {authors} authors!")
+            return 1
+        table.add_row(str(authors), f"{scan:.0f}", f"{counters:.0f}", f"x{scan / counters:.1f}")
+
+    Console().print(table)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
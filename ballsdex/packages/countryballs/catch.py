@@ -0,0 +1,160 @@
+import json
+from datetime import datetime
+from typing import NamedTuple
+
+from tortoise import Tortoise, timezone
+from tortoise.exceptions import IntegrityError
+
+from ballsdex.core.models import Ball, BallInstance, Player, Special, player_cache
+from ballsdex.core.utils.completion import owned_balls
+
+# Upserts the player while crediting the coins, checks if the player already owns this ball and
+# creates the instance, in a single statement. The sub-statements share the same snapshot, so
+# the new instance is not seen by the ownership check. If the spawn was already caught, the unique
+# spawn ID makes the whole statement fail, coins included. Parameters are cast explicitly, their
+# types would otherwise be inferred from the columns through the INSERT ... SELECT.
+CATCH_QUERY = """
+WITH upsert AS (
+    INSERT INTO player (
+        discord_id, donation_policy, privacy_policy, mention_policy, friend_policy,
+        trade_cooldown_policy, extra_data, money
+    )
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+    ON CONFLICT (discord_id) DO UPDATE SET money = player.money + EXCLUDED.money
+    RETURNING *
+),
+previous AS (
+    SELECT EXISTS (
+        SELECT 1 FROM ballinstance, upsert
+        WHERE ballinstance.player_id = upsert.id AND ballinstance.ball_id = $9::bigint
+    ) AS caught_before
+),
+created AS (
+    INSERT INTO ballinstance (
+        ball_id, player_id, catch_date, spawned_time, server_id, special_id, health_bonus,
+        attack_bonus, spawn_id, favorite, tradeable, extra_data
+    )
+    SELECT
+        $9::bigint, upsert.id, $10::timestamptz, $11::timestamptz, $12::bigint, $13::bigint,
+        $14::int, $15::int, $16::bigint, false, true, '{}'
+    FROM upsert
+    RETURNING id
+)
+SELECT upsert.*, previous.caught_before, created.id AS instance_id
+FROM upsert, previous, created
+"""
+# unique constraint of `ballinstance.spawn_id`, created by admin panel migration 0014
+SPAWN_ID_CONSTRAINT = "ballinstance_spawn_id_key"
+
+
+class AlreadyCaught(Exception):
+    """
+    Raised when the countryball of a spawn was already given to someone.
+    """
+
+
+class CatchResult(NamedTuple):
+    player: Player
+    instance: BallInstance
+    is_new: bool
+
+
+async def create_caught_instance(
+    discord_id: int,
+    ball: Ball,
+    *,
+    coins: int = 0,
+    special: Special | None = None,
+    attack_bonus: int = 0,
+    health_bonus: int = 0,
+    server_id: int | None = None,
+    spawned_time: datetime | None = None,
+    spawn_id: int | None = None,
+) -> CatchResult:
+    """
+    Give a new countryball to a player, in one round trip to the database. The player is
+    created if needed, and credited with the given coins.
+
+    Parameters
+    ----------
+    discord_id: int
+        Discord ID of the player catching the countryball.
+    ball: Ball
+        The countryball caught.
+    coins: int
+        Coins added to the player's balance.
+    special: Special | None
+        Special event of the new instance.
+    attack_bonus: int
+        Attack bonus of the new instance.
+    health_bonus: int
+        Health bonus of the new instance.
+    server_id: int | None
+        ID of the guild where the countryball was caught.
+    spawned_time: datetime | None
+        When the countryball was spawned.
+    spawn_id: int | None
+        ID of the spawn message. Only one instance can be created per spawn, even across
+        processes.
+
+    Returns
+    -------
+    CatchResult
+        The up-to-date player, the new instance, and whether this is the first time this
+        player catches this countryball.
+
+    Raises
+    ------
+    AlreadyCaught
+        An instance was already created from this spawn. Nothing was written.
+    """
+    # defaults of a new player, from the model
+    default = Player(discord_id=discord_id)
+    catch_date = timezone.now()
+    connection = Tortoise.get_connection("default")
+    try:
+        _, rows = await connection.execute_query(
+            CATCH_QUERY,
+            [
+                discord_id,
+                default.donation_policy.value,
+                default.privacy_policy.value,
+                default.mention_policy.value,
+                default.friend_policy.value,
+                default.trade_cooldown_policy.value,
+                json.dumps(default.extra_data),
+                coins,
+                ball.pk,
+                catch_date,
+                spawned_time,
+                server_id,
+                special.pk if special else None,
+                health_bonus,
+                attack_bonus,
+                spawn_id,
+            ],
+        )
+    except IntegrityError as e:
+        # the asyncpg exception is wrapped by Tortoise
+        if getattr(e.args[0], "constraint_name", None) == SPAWN_ID_CONSTRAINT:
+            raise AlreadyCaught from e
+        raise
+    row = rows[0]
+    player = Player._init_from_db(**{column: row[column] for column in Player._meta.db_fields})
+    player_cache.put(player)
+
+    instance = BallInstance(
+        ball=ball,
+        player=player,
+        special=special,
+        attack_bonus=attack_bonus,
+        health_bonus=health_bonus,
+        server_id=server_id,
+        spawned_time=spawned_time,
+        catch_date=catch_date,
+        spawn_id=spawn_id,
+    )
+    instance.pk = row["instance_id"]
+    instance._saved_in_db = True
+    owned_balls.add(player.pk, ball.pk)
+    return CatchResult(player, instance, not row["caught_before"])
@@ -0,0 +1,130 @@
+"""
+Latency benchmark of the database queries of a catch, against the database configured with
+`BALLSDEXBOT_DB_URL` (use a local one, not production).
+
+Compares the previous sequence of ORM queries (player `get_or_create`, `add_money`, ownership
+check and instance creation) with the single statement of `create_caught_instance`, under
+bursts of concurrent catches. The players are created with fake Discord IDs and deleted with
+their countryballs afterwards.
+
+Usage: python3 -m ballsdex.packages.countryballs.catch_benchmark [-n 1000] [-c 25]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable
+
+from rich.console import Console
+from rich.table import Table
+from tortoise import Tortoise
+
+from ballsdex.__main__ import init_tortoise
+from ballsdex.core.models import Ball, BallInstance, Player
+from ballsdex.packages.countryballs.catch import create_caught_instance
+
+# far above the current snowflakes, to never collide with real users
+FAKE_ID_BASE = 9_000_000_000_000_000_000
+
+
+async def orm_catch(discord_id: int, ball: Ball, coins: int):
+    player, _ = await Player.get_or_create(discord_id=discord_id)
+    await player.add_money(coins)
+    await BallInstance.filter(player=player, ball=ball).exists()
+    await BallInstance.create(ball=ball, player=player, attack_bonus=0, health_bonus=0)
+
+
+async def query_catch(discord_id: int, ball: Ball, coins: int):
+    await create_caught_instance(discord_id, ball, coins=coins)
+
+
+async def cleanup():
+    ids = await Player.filter(discord_id__gte=FAKE_ID_BASE).values_list("id", flat=True)
+    if ids:
+        await BallInstance.filter(player_id__in=ids).delete()
+        await Player.filter(id__in=ids).delete()
+
+
+async def run(
+    catch: Callable[[int, Ball, int], Awaitable[None]],
+    balls: list[Ball],
+    catches: int,
+    players: int,
+    concurrency: int,
+) -> tuple[list[float], float]:
+    """
+    Run the catches with the given concurrency, returning the latency of each and the total
+    duration.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def timed_catch():
+        async with semaphore:
+            t1 = time.perf_counter()
+            discord_id = FAKE_ID_BASE + random.randrange(players)
+            await catch(discord_id, random.choice(balls), random.randint(10, 50))
+            latencies.append(time.perf_counter() - t1)
+
+    t1 = time.perf_counter()
+    await asyncio.gather(*(timed_catch() for _ in range(catches)))
+    return latencies, time.perf_counter() - t1
+
+
+async def benchmark(catches: int, players: int, concurrency: int) -> int:
+    await init_tortoise(os.environ["BALLSDEXBOT_DB_URL"], skip_migrations=True)
+    try:
+        balls = await Ball.filter(enabled=True).limit(50)
+        if not balls:
+            print("There are no enabled countryballs in this database.")
+            return 1
+
+        table = Table(title=f"{catches} catches, {concurrency} concurrent, {players} players")
+        table.add_column("Implementation", style="cyan")
+        for column in ("p50 (ms)", "p95 (ms)", "p99 (ms)", "max (ms)", "catches/s"):
+            table.add_column(column, justify="right")
+
+        for name, catch in (("ORM queries", orm_catch), ("Single statement", query_catch)):
+            await cleanup()
+            latencies, duration = await run(catch, balls, catches, players, concurrency)
+            quantiles = statistics.quantiles(latencies, n=100)
+            table.add_row(
+                name,
+                f"{quantiles[49] * 1000:.1f}",
+                f"{quantiles[94] * 1000:.1f}",
+                f"{quantiles[98] * 1000:.1f}",
+                f"{max(latencies) * 1000:.1f}",
+                f"{catches / duration:.0f}",
+            )
+        await cleanup()
+        Console().print(table)
+        return 0
+    finally:
+        await Tortoise.close_connections()
+
+
+def main(arguments: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m ballsdex.packages.countryballs.catch_benchmark",
+        description="Benchmark the latency of the catch queries against a local database",
+    )
+    parser.add_argument("-n", "--catches", type=int, default=1000)
+    parser.add_argument("-c", "--concurrency", type=int, default=25)
+    parser.add_argument(
+        "-p", "--players", type=int, default=200, help="Number of distinct players catching"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(arguments)
+    random.seed(args.seed)
+    if "BALLSDEXBOT_DB_URL" not in os.environ:
+        print("Set the BALLSDEXBOT_DB_URL environment variable to a local database.")
+        return 1
+    return asyncio.run(benchmark(args.catches, args.players, args.concurrency))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,14 +1,21 @@
+import asyncio
+import contextlib
 import importlib
 import logging
+import os
+from pathlib import Path
 from typing import TYPE_CHECKING, cast
 
+import asyncpg
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from tortoise.exceptions import DoesNotExist
 
 from ballsdex.core.models import GuildConfig
 from ballsdex.packages.countryballs.countryball import BallSpawnView
+from ballsdex.packages.countryballs.dispatcher import SpawnDispatcher
 from ballsdex.packages.countryballs.spawn import BaseSpawnManager
+from ballsdex.packages.countryballs.sync import GuildConfigSync
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -31,14 +38,97 @@ class CountryBallsSpawner(commands.Cog):
         importlib.reload(module)
         spawn_manager = getattr(module, class_name)
         self.spawn_manager = spawn_manager(bot)
+        self.dispatcher = SpawnDispatcher(
+            bot,
+            self.countryball_cls,
+            workers=settings.spawn_dispatch_workers,
+            queue_size=settings.spawn_dispatch_queue_size,
+            channel_interval=settings.spawn_dispatch_channel_interval,
+        )
+        self.config_sync: GuildConfigSync | None = None
+
+    async def cog_load(self):
+        await self.restore_spawn_state()
+        self.save_spawn_state.start()
+        self.dispatcher.start()
+        await self.start_config_sync()
+
+    async def cog_unload(self):
+        self.save_spawn_state.cancel()
+        await self.dispatcher.stop()
+        if self.config_sync:
+            await self.config_sync.stop()
+        data = self.spawn_manager.snapshot()
+        if data is not None:
+            self.write_spawn_state(data)
+
+    def write_spawn_state(self, data: bytes):
+        if not settings.spawn_state_path:
+            return
+        path = Path(settings.spawn_state_path)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            log.exception("Failed to save the spawn manager state")
+
+    async def restore_spawn_state(self):
+        if not settings.spawn_state_path:
+            return
+        path = Path(settings.spawn_state_path)
+        try:
+            data = await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            return
+        except OSError:
+            log.exception("Failed to read the spawn manager state")
+            return
+        try:
+            # listeners are not registered yet, nothing else accesses the manager
+            await asyncio.to_thread(self.spawn_manager.restore, data)
+        except ValueError:
+            log.warning("Ignoring the saved spawn manager state", exc_info=True)
+        else:
+            log.info("Restored the spawn manager state.")
+
+    @tasks.loop(minutes=5)
+    async def save_spawn_state(self):
+        data = self.spawn_manager.snapshot()
+        if data is not None:
+            await asyncio.to_thread(self.write_spawn_state, data)
+
+    async def start_config_sync(self):
+        """
+        Listen to the changes of guild configs made by other processes, such as the admin panel.
+        This must run before `load_cache`, to not miss changes made in between.
+        """
+        dsn = os.environ.get("BALLSDEXBOT_DB_URL")
+        if not dsn:
+            return
+        self.config_sync = GuildConfigSync(self.cache, dsn, on_reconnect=self.load_cache)
+        try:
+            await self.config_sync.start()
+        except (OSError, asyncpg.PostgresError):
+            log.exception(
+                "Failed to listen to guild config changes, edits from the admin panel will "
+                "require a cache reload"
+            )
+            self.config_sync = None
 
     async def load_cache(self):
         i = 0
-        async for config in GuildConfig.filter(enabled=True, spawn_channel__isnull=False).only(
-            "guild_id", "spawn_channel"
-        ):
-            self.cache[config.guild_id] = config.spawn_channel
-            i += 1
+        cache: dict[int, int] = {}
+        # changes notified while the query runs are applied again after replacing the cache
+        with self.config_sync.buffer_changes() if self.config_sync else contextlib.nullcontext():
+            async for config in GuildConfig.filter(enabled=True, spawn_channel__isnull=False).only(
+                "guild_id", "spawn_channel"
+            ):
+                cache[config.guild_id] = config.spawn_channel
+                i += 1
+            # the dict is shared with the config sync, update it in place
+            self.cache.clear()
+            self.cache.update(cache)
         grammar = "" if i == 1 else "s"
         log.info(f"Loaded {i} guild{grammar} in cache.")
 
@@ -68,9 +158,7 @@ class CountryBallsSpawner(commands.Cog):
             log.warning(f"Lost channel {self.cache[guild.id]} for guild {guild.name}.")
             del self.cache[guild.id]
             return
-        ball = await BallSpawnView.get_random(self.bot)
-        ball.algo = algo
-        await ball.spawn(cast(discord.TextChannel, channel))
+        self.dispatcher.enqueue(cast(discord.TextChannel, channel), algo)
 
     @commands.Cog.listener()
     async def on_ballsdex_settings_change(
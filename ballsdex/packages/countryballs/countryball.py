@@ -4,13 +4,13 @@ import logging
 import math
 import random
 import string
-from datetime import datetime
 from typing import TYPE_CHECKING
 
 import discord
+from cachetools import TTLCache
 from discord.ui import Button, Modal, TextInput, View, button
-from tortoise.timezone import get_default_timezone
 from tortoise.timezone import now as tortoise_now
+from tortoise.transactions import in_transaction
 
 from ballsdex.core.metrics import caught_balls
 from ballsdex.core.models import (
@@ -20,9 +20,11 @@ from ballsdex.core.models import (
     Special,
     Trade,
     TradeObject,
-    balls,
-    specials,
+    player_cache,
 )
+from ballsdex.core.utils.completion import owned_balls
+from ballsdex.core.utils.formatting import normalize_name
+from ballsdex.packages.countryballs.catch import AlreadyCaught, create_caught_instance
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -30,6 +32,9 @@ if TYPE_CHECKING:
 
 log = logging.getLogger("ballsdex.packages.countryballs")
 
+# spawn messages whose countryball was claimed by a guess
+claimed_spawns: TTLCache[int, bool] = TTLCache(maxsize=100000, ttl=3600)
+
 
 class CountryballNamePrompt(Modal, title=f"Catch this {settings.collectible_name}!"):
     name = TextInput(
@@ -55,26 +60,36 @@ class CountryballNamePrompt(Modal, title=f"Catch this {settings.collectible_name
                 f"An error occured with this {settings.collectible_name}.",
             )
 
+    async def get_player(self, user: discord.abc.User) -> Player:
+        """
+        Fetch the player for its mention policy, without creating it (guesses must not write).
+        """
+        return await player_cache.get_or_none(user.id) or Player(discord_id=user.id)
+
+    async def send_slow_message(self, interaction: discord.Interaction["BallsDexBot"]):
+        player = await self.get_player(interaction.user)
+        slow_message = random.choice(settings.slow_messages).format(
+            user=interaction.user.mention,
+            collectible=settings.collectible_name,
+            ball=self.view.name,
+            collectibles=settings.plural_collectible_name,
+        )
+
+        await interaction.followup.send(
+            slow_message,
+            ephemeral=True,
+            allowed_mentions=discord.AllowedMentions(users=player.can_be_mentioned),
+        )
+
     async def on_submit(self, interaction: discord.Interaction["BallsDexBot"]):
         await interaction.response.defer(thinking=True)
 
-        player, _ = await Player.get_or_create(discord_id=interaction.user.id)
         if self.view.caught:
-            slow_message = random.choice(settings.slow_messages).format(
-                user=interaction.user.mention,
-                collectible=settings.collectible_name,
-                ball=self.view.name,
-                collectibles=settings.plural_collectible_name,
-            )
-
-            await interaction.followup.send(
-                slow_message,
-                ephemeral=True,
-                allowed_mentions=discord.AllowedMentions(users=player.can_be_mentioned),
-            )
+            await self.send_slow_message(interaction)
             return
 
         if not self.view.is_name_valid(self.name.value):
+            player = await self.get_player(interaction.user)
             if len(self.name.value) > 500:
                 wrong_name = self.name.value[:500] + "..."
             else:
@@ -97,16 +112,20 @@ class CountryballNamePrompt(Modal, title=f"Catch this {settings.collectible_name
             )
             return
 
+        # the countryball is claimed without awaiting anything since the `caught` check above
         coins = random.randint(10, 50)
-        await player.add_money(coins)
-
-        ball, has_caught_before = await self.view.catch_ball(
-            interaction.user, player=player, guild=interaction.guild
-        )
+        try:
+            ball, has_caught_before = await self.view.catch_ball(
+                interaction.user, player=None, guild=interaction.guild, coins=coins
+            )
+        except AlreadyCaught:
+            # caught through another process
+            await self.send_slow_message(interaction)
+            return
 
         await interaction.followup.send(
             self.view.get_catch_message(ball, has_caught_before, interaction.user.mention, coins),
-            allowed_mentions=discord.AllowedMentions(users=player.can_be_mentioned),
+            allowed_mentions=discord.AllowedMentions(users=ball.player.can_be_mentioned),
         )
         await interaction.followup.edit_message(self.view.message.id, view=self.view)
 
@@ -206,42 +225,16 @@ class BallSpawnView(View):
         """
         Get a new instance with a random countryball. Rarity values are taken into account.
         """
-        countryballs = list(filter(lambda m: m.enabled, balls.values()))
-        if not countryballs:
+        if not bot.ball_table:
             raise RuntimeError("No ball to spawn")
-        rarities = [x.rarity for x in countryballs]
-        cb = random.choices(population=countryballs, weights=rarities, k=1)[0]
-        return cls(bot, cb)
+        return cls(bot, bot.ball_table.draw())
 
     @property
     def name(self):
         return self.model.country
 
     def get_random_special(self) -> Special | None:
-        population = [
-            x
-            for x in specials.values()
-            # handle null start/end dates with infinity times
-            if (x.start_date or datetime.min.replace(tzinfo=get_default_timezone()))
-            <= tortoise_now()
-            <= (x.end_date or datetime.max.replace(tzinfo=get_default_timezone()))
-        ]
-
-        if not population:
-            return None
-
-        common_weight: float = 1 - sum(x.rarity for x in population)
-
-        if common_weight < 0:
-            common_weight = 0
-
-        weights = [x.rarity for x in population] + [common_weight]
-        # None is added representing the common countryball
-        special: Special | None = random.choices(
-            population=population + [None], weights=weights, k=1
-        )[0]
-
-        return special
+        return self.bot.special_schedule.draw(tortoise_now())
 
     async def spawn(self, channel: discord.TextChannel) -> bool:
         """
@@ -264,9 +257,6 @@ class BallSpawnView(View):
             source = string.ascii_uppercase + string.ascii_lowercase + string.ascii_letters
             return "".join(random.choices(source, k=15))
 
-        extension = self.model.wild_card.split(".")[-1]
-        file_location = "./admin_panel/media/" + self.model.wild_card
-        file_name = f"nt_{generate_random_name()}.{extension}"
         try:
             permissions = channel.permissions_for(channel.guild.me)
             if permissions.attach_files and permissions.send_messages:
@@ -276,10 +266,14 @@ class BallSpawnView(View):
                     collectibles=settings.plural_collectible_name,
                 )
 
-                self.message = await channel.send(
-                    spawn_message,
+                self.message = await self.bot.attachment_cache.send(
+                    channel.send,
+                    self.bot.spawn_assets.get_file(
+                        self.model.wild_card, f"nt_{generate_random_name()}"
+                    ),
+                    reuse=settings.render_reuse_spawn_uploads,
+                    content=spawn_message,
                     view=self,
-                    file=discord.File(file_location, filename=file_name),
                 )
                 return True
             else:
@@ -290,6 +284,23 @@ class BallSpawnView(View):
             log.error("Failed to spawn ball", exc_info=True)
         return False
 
+    def claim(self) -> bool:
+        """
+        Reserve this countryball for a catch. This must be called without awaiting anything
+        since checking `caught`, then only the caller may write the catch to the database.
+
+        Returns
+        -------
+        bool
+            `False` if the countryball was already claimed.
+        """
+        if self.caught or (self.message and self.message.id in claimed_spawns):
+            return False
+        self.caught = True
+        if self.message:
+            claimed_spawns[self.message.id] = True
+        return True
+
     def is_name_valid(self, text: str) -> bool:
         """
         Check if the prompted name is valid.
@@ -297,27 +308,15 @@ class BallSpawnView(View):
         Parameters
         ----------
         text: str
-            The text entered by the user. It will be lowered and stripped of enclosing blank
-            characters.
+            The text entered by the user. It will be normalized with `normalize_name` before
+            comparison.
 
         Returns
         -------
         bool
             Whether the name matches or not.
         """
-        if self.model.catch_names:
-            possible_names = (self.name.lower(), *self.model.catch_names.split(";"))
-        else:
-            possible_names = (self.name.lower(),)
-        if self.model.translations:
-            possible_names += tuple(x.lower() for x in self.model.translations.split(";"))
-        cname = text.lower().strip()
-        # Remove fancy unicode characters like ’ to replace to '
-        cname = cname.replace("\u2019", "'")
-        cname = cname.replace("\u2018", "'")
-        cname = cname.replace("\u201c", '"')
-        cname = cname.replace("\u201d", '"')
-        return cname in possible_names
+        return normalize_name(text) in self.model.cached_catch_names
 
     async def catch_ball(
         self,
@@ -325,6 +324,7 @@ class BallSpawnView(View):
         *,
         player: Player | None,
         guild: discord.Guild | None,
+        coins: int = 0,
     ) -> tuple[BallInstance, bool]:
         """
         Mark this countryball as caught and assign a new `BallInstance` (or transfer ownership if
@@ -334,11 +334,15 @@ class BallSpawnView(View):
         ----------
         user: discord.User | discord.Member
             The user that will obtain the new countryball.
-        player: Player
-            If already fetched, add the player model here to avoid an additional query.
+        player: Player | None
+            If already fetched, add the player model here to avoid an additional query when
+            transferring `ballinstance`. New countryballs are given with a single query that
+            fetches the player, use the `player` attribute of the returned instance.
         guild: discord.Guild | None
             If caught in a guild, specify here for additional logs. Will be extracted from `user`
             if it's a member object.
+        coins: int
+            Coins given to the player with the countryball.
 
         Returns
         -------
@@ -353,26 +357,33 @@ class BallSpawnView(View):
         RuntimeError
             The `caught` attribute is already set to `True`. You should always check before calling
             this function that the ball was not caught.
+        AlreadyCaught
+            The countryball was caught through another bot process. Nothing was written.
         """
-        if self.caught:
+        if not self.claim():
             raise RuntimeError("This ball was already caught!")
-        self.caught = True
         for item in self.children:
             item.disabled = True # type: ignore
-        player = player or (await Player.get_or_create(discord_id=user.id))[0]
-        is_new = not await BallInstance.filter(player=player, ball=self.model).exists()
 
         if self.ballinstance:
-            # if specified, do not create a countryball but switch owner
-            # it's important to register this as a trade to avoid bypass
-            trade = await Trade.create(player1=self.ballinstance.player, player2=player)
-            await TradeObject.create(
-                trade=trade, player=self.ballinstance.player, ballinstance=self.ballinstance
-            )
-            self.ballinstance.trade_player = self.ballinstance.player
-            self.ballinstance.player = player
-            self.ballinstance.locked = None  # type: ignore
-            await self.ballinstance.save(update_fields=("player_id", "trade_player_id", "locked"))
+            async with in_transaction():
+                player = player or (await Player.get_or_create(discord_id=user.id))[0]
+                if coins:
+                    await player.add_money(coins)
+                is_new = not await owned_balls.owns(player.pk, self.model.pk)
+                # if specified, do not create a countryball but switch owner
+                # it's important to register this as a trade to avoid bypass
+                trade = await Trade.create(player1=self.ballinstance.player, player2=player)
+                await TradeObject.create(
+                    trade=trade, player=self.ballinstance.player, ballinstance=self.ballinstance
+                )
+                owned_balls.discard(self.ballinstance.player_id)
+                self.ballinstance.trade_player = self.ballinstance.player
+                self.ballinstance.player = player
+                self.ballinstance.locked = None  # type: ignore
+                await self.ballinstance.save(
+                    update_fields=("player_id", "trade_player_id", "locked")
+                )
             return self.ballinstance, is_new
 
         # stat may vary by +/- 20% of base stat
@@ -393,9 +404,12 @@ class BallSpawnView(View):
         if not special:
             special = self.get_random_special()
 
-        ball = await BallInstance.create(
-            ball=self.model,
-            player=player,
+        # player upsert, coins, first catch check and instance creation in one query
+        _, ball, is_new = await create_caught_instance(
+            user.id,
+            self.model,
+            spawn_id=self.message.id,
+            coins=coins,
             special=special,
             attack_bonus=bonus_attack,
             health_bonus=bonus_health,
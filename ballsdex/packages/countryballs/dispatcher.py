@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+import discord
+
+from ballsdex.core.metrics import spawn_dispatch_dropped, spawn_dispatch_latency, spawn_queue_depth
+
+if TYPE_CHECKING:
+    from ballsdex.core.bot import BallsDexBot
+    from ballsdex.packages.countryballs.countryball import BallSpawnView
+
+log = logging.getLogger("ballsdex.packages.countryballs.dispatcher")
+
+
+class SpawnRequest(NamedTuple):
+    channel: discord.TextChannel
+    algo: str
+    enqueued_at: float
+
+
+class SpawnDispatcher:
+    """
+    Sends the spawns decided by the spawn manager from a fixed pool of background tasks, so
+    that uploading spawn images never holds up the processing of messages.
+
+    A channel has at most one spawn waiting or being sent, further spawns are dropped until it
+    is sent. Spawns in the same channel are also spaced by a minimum interval, to stay clear of
+    Discord's per-channel rate limits.
+
+    Parameters
+    ----------
+    bot: BallsDexBot
+        The bot instance.
+    countryball_cls: type[BallSpawnView]
+        The class used to spawn random countryballs.
+    workers: int
+        Number of spawns sent concurrently.
+    queue_size: int
+        Maximum number of spawns waiting to be sent, further spawns are dropped.
+    channel_interval: float
+        Minimum number of seconds between two spawns sent in the same channel.
+    """
+
+    def __init__(
+        self,
+        bot: "BallsDexBot",
+        countryball_cls: type["BallSpawnView"],
+        workers: int = 4,
+        queue_size: int = 1000,
+        channel_interval: float = 1.0,
+    ):
+        self.bot = bot
+        self.countryball_cls = countryball_cls
+        self.workers = workers
+        self.channel_interval = channel_interval
+        self.queue: asyncio.Queue[SpawnRequest] = asyncio.Queue(queue_size)
+        # channels with a spawn waiting or being sent
+        self.pending: set[int] = set()
+        # monotonic time before which the next spawn of a channel must wait
+        self.next_send: dict[int, float] = {}
+        self.tasks: list[asyncio.Task] = []
+
+    def start(self):
+        for i in range(self.workers):
+            self.tasks.append(asyncio.create_task(self.worker(), name=f"spawn-dispatcher-{i}"))
+
+    async def stop(self):
+        """
+        Stop the workers. Spawns still in the queue are discarded.
+        """
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+
+    def enqueue(self, channel: discord.TextChannel, algo: str) -> bool:
+        """
+        Queue a random spawn in the given channel.
+
+        Returns
+        -------
+        bool
+            `False` if the spawn was dropped, because the channel already has a spawn waiting or
+            because the queue is full.
+        """
+        if channel.id in self.pending:
+            spawn_dispatch_dropped.labels(reason="coalesced").inc()
+            return False
+        try:
+            self.queue.put_nowait(SpawnRequest(channel, algo, time.monotonic()))
+        except asyncio.QueueFull:
+            log.warning(f"Spawn queue full, dropping spawn in guild {channel.guild.id}")
+            spawn_dispatch_dropped.labels(reason="queue_full").inc()
+            return False
+        self.pending.add(channel.id)
+        spawn_queue_depth.set(self.queue.qsize())
+        return True
+
+    async def worker(self):
+        while True:
+            request = await self.queue.get()
+            spawn_queue_depth.set(self.queue.qsize())
+            try:
+                await self.dispatch(request)
+            except Exception:
+                log.exception(f"Failed to spawn in channel {request.channel.id}")
+            finally:
+                self.pending.discard(request.channel.id)
+                self.queue.task_done()
+
+    async def dispatch(self, request: SpawnRequest):
+        channel_id = request.channel.id
+        now = time.monotonic()
+        ready_at = self.next_send.get(channel_id, now)
+        self.next_send[channel_id] = max(now, ready_at) + self.channel_interval
+        if len(self.next_send) > self.queue.maxsize:
+            self.next_send = {k: v for k, v in self.next_send.items() if v > now}
+        if ready_at > now:
+            await asyncio.sleep(ready_at - now)
+
+        ball = await self.countryball_cls.get_random(self.bot)
+        ball.algo = request.algo
+        await ball.spawn(request.channel)
+        spawn_dispatch_latency.observe(time.monotonic() - request.enqueued_at)
@@ -0,0 +1,302 @@
+"""
+Offline simulator for spawn managers.
+
+Replays a message trace through any `BaseSpawnManager` implementation, without Discord, and
+reports the throughput, the number of spawns per guild and hour, and the memory used per guild.
+
+The trace is either generated (guild sizes, author distributions, message lengths and times
+are randomized from the options) or read from a JSON lines file, one message per line:
+{"timestamp": 1700000000.0, "guild_id": 1, "member_count": 120, "author_id": 5, "length": 12}
+
+Message timestamps act as the clock: managers must rely on `message.created_at`, and
+`asyncio.sleep` is replaced by a no-op during the simulation.
+
+Usage: python3 -m ballsdex.packages.countryballs.simulator [--guilds 200] [--hours 24]
+       [--manager ballsdex.packages.countryballs.spawn.SpawnManager] [--trace file.jsonl]
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterable, Iterator
+
+from rich.console import Console
+from rich.table import Table
+
+from ballsdex.packages.countryballs.spawn import BaseSpawnManager
+
+SIZE_BUCKETS = ((1, 5, "1-4"), (5, 100, "5-99"), (100, 1000, "100-999"), (1000, math.inf, "1000+"))
+
+
+@dataclass(slots=True)
+class TraceMessage:
+    timestamp: float
+    guild_id: int
+    member_count: int
+    author_id: int
+    length: int
+
+
+def generate_trace(
+    guilds: int, hours: float, messages_per_hour: float, author_skew: float, short_ratio: float
+) -> list[TraceMessage]:
+    """
+    Generate a synthetic trace. Guild sizes are log-uniform between 2 and 50000 members,
+    activity grows with the size, authors follow a Zipf distribution of parameter
+    `author_skew`, and each message is shorter than 5 characters with `short_ratio` chance.
+    """
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+    duration = hours * 3600
+    messages: list[TraceMessage] = []
+    for guild_id in range(1, guilds + 1):
+        member_count = int(math.exp(random.uniform(math.log(2), math.log(50000))))
+        chatters = max(1, min(member_count, int(member_count**0.5 * 2)))
+        weights = [1 / (rank**author_skew) for rank in range(1, chatters + 1)]
+        # busier servers have more messages, with a lot of variance between servers
+        rate = messages_per_hour * random.lognormvariate(0, 1) * math.log10(member_count + 1)
+        count = int(rate * hours)
+        timestamps = sorted(random.uniform(start, start + duration) for _ in range(count))
+        authors = random.choices(range(chatters), weights=weights, k=count)
+        for timestamp, author in zip(timestamps, authors):
+            if random.random() < short_ratio:
+                length = random.randint(1, 4)
+            else:
+                length = random.randint(5, 200)
+            messages.append(
+                TraceMessage(timestamp, guild_id, member_count, guild_id << 20 | author, length)
+            )
+    messages.sort(key=lambda x: x.timestamp)
+    return messages
+
+
+def read_trace(path: Path) -> list[TraceMessage]:
+    with path.open() as file:
+        messages = [TraceMessage(**json.loads(line)) for line in file if line.strip()]
+    messages.sort(key=lambda x: x.timestamp)
+    return messages
+
+
+def write_trace(path: Path, messages: Iterable[TraceMessage]):
+    with path.open("w") as file:
+        for message in messages:
+            file.write(json.dumps(asdict(message)) + "\n")
+
+
+def build_messages(trace: list[TraceMessage]) -> list[SimpleNamespace]:
+    """
+    Build objects with the attributes of `discord.Message` read by spawn managers.
+    """
+    state = SimpleNamespace(intents=SimpleNamespace(message_content=True))
+    guilds: dict[int, SimpleNamespace] = {}
+    authors: dict[int, SimpleNamespace] = {}
+    messages: list[SimpleNamespace] = []
+    for x in trace:
+        guild = guilds.get(x.guild_id)
+        if guild is None:
+            guild = SimpleNamespace(
+                id=x.guild_id, name=f"Guild {x.guild_id}", member_count=x.member_count, icon=None
+            )
+            guilds[x.guild_id] = guild
+        author = authors.get(x.author_id)
+        if author is None:
+            author = SimpleNamespace(id=x.author_id, bot=False)
+            authors[x.author_id] = author
+        messages.append(
+            SimpleNamespace(
+                guild=guild,
+                author=author,
+                content="x" * x.length,
+                created_at=datetime.fromtimestamp(x.timestamp, tz=timezone.utc),
+                webhook_id=None,
+                _state=state,
+            )
+        )
+    return messages
+
+
+@contextmanager
+def instant_sleep() -> Iterator[None]:
+    async def sleep(delay: float, result=None):
+        return result
+
+    original = asyncio.sleep
+    asyncio.sleep = sleep  # type: ignore
+    try:
+        yield
+    finally:
+        asyncio.sleep = original
+
+
+def load_manager(path: str) -> type[BaseSpawnManager]:
+    module_path, class_name = path.rsplit(".", 1)
+    return getattr(importlib.import_module(module_path), class_name)
+
+
+async def replay(
+    manager: BaseSpawnManager, messages: list[SimpleNamespace]
+) -> tuple[float, dict[int, int]]:
+    """
+    Feed the messages to the manager, returning the time spent and the spawns per guild.
+    """
+    spawns: dict[int, int] = {}
+    handle_message = manager.handle_message
+    start = time.perf_counter()
+    for message in messages:
+        result = await handle_message(message)  # type: ignore
+        if result is not False:
+            spawns[message.guild.id] = spawns.get(message.guild.id, 0) + 1
+    return time.perf_counter() - start, spawns
+
+
+async def simulate(
+    manager_cls: type[BaseSpawnManager], messages: list[SimpleNamespace], measure_memory: bool
+) -> dict:
+    bot = SimpleNamespace()
+    with instant_sleep():
+        elapsed, spawns = await replay(manager_cls(bot), messages)  # type: ignore
+
+        memory = None
+        if measure_memory:
+            # separate run, tracemalloc slows down execution a lot
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            manager = manager_cls(bot)  # type: ignore
+            await replay(manager, messages)
+            memory = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+            del manager
+
+    guilds = {x.guild.id: x.guild.member_count for x in messages}
+    hours = (messages[-1].created_at - messages[0].created_at).total_seconds() / 3600
+    buckets = []
+    for low, high, name in SIZE_BUCKETS:
+        ids = [id for id, count in guilds.items() if low <= count < high]
+        if not ids:
+            continue
+        total = sum(spawns.get(id, 0) for id in ids)
+        buckets.append(
+            {
+                "members": name,
+                "guilds": len(ids),
+                "spawns": total,
+                "spawns_per_guild_hour": round(total / len(ids) / hours, 4) if hours else None,
+            }
+        )
+
+    return {
+        "manager": f"{manager_cls.__module__}.{manager_cls.__name__}",
+        "messages": len(messages),
+        "guilds": len(guilds),
+        "hours": round(hours, 2),
+        "seconds": round(elapsed, 3),
+        "messages_per_second": round(len(messages) / elapsed) if elapsed else None,
+        "spawns": sum(spawns.values()),
+        "spawns_per_guild_hour": (
+            round(sum(spawns.values()) / len(guilds) / hours, 4) if hours else None
+        ),
+        "memory_per_guild_bytes": round(memory / len(guilds)) if memory is not None else None,
+        "by_size": buckets,
+    }
+
+
+def print_results(results: dict):
+    console = Console()
+    table = Table(title=f"Spawn simulation of {results['manager']}")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right")
+    for key, name in (
+        ("messages", "Messages"),
+        ("guilds", "Guilds"),
+        ("hours", "Simulated hours"),
+        ("messages_per_second", "Messages/s"),
+        ("spawns", "Spawns"),
+        ("spawns_per_guild_hour", "Spawns per guild-hour"),
+        ("memory_per_guild_bytes", "Memory per guild (bytes)"),
+    ):
+        table.add_row(name, str(results[key]))
+    console.print(table)
+
+    table = Table(title="Spawns by server size")
+    table.add_column("Members", style="cyan")
+    table.add_column("Guilds", justify="right")
+    table.add_column("Spawns", justify="right")
+    table.add_column("Spawns per guild-hour", justify="right")
+    for bucket in results["by_size"]:
+        table.add_row(
+            bucket["members"],
+            str(bucket["guilds"]),
+            str(bucket["spawns"]),
+            str(bucket["spawns_per_guild_hour"]),
+        )
+    console.print(table)
+
+
+def main(arguments: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m ballsdex.packages.countryballs.simulator",
+        description="Replay message traces through a spawn manager",
+    )
+    parser.add_argument(
+        "--manager",
+        default="ballsdex.packages.countryballs.spawn.SpawnManager",
+        help="Python path to the BaseSpawnManager implementation to simulate",
+    )
+    parser.add_argument("--trace", type=Path, help="Replay this JSON lines trace")
+    parser.add_argument("--record", type=Path, help="Write the generated trace to this file")
+    parser.add_argument("--guilds", type=int, default=200, help="Number of generated guilds")
+    parser.add_argument("--hours", type=float, default=24, help="Duration of the generated trace")
+    parser.add_argument(
+        "--messages-per-hour",
+        type=float,
+        default=60,
+        help="Median hourly messages of a generated guild, scaled with its size",
+    )
+    parser.add_argument(
+        "--author-skew",
+        type=float,
+        default=1.1,
+        help="Zipf parameter of the authors distribution, higher means fewer active chatters",
+    )
+    parser.add_argument(
+        "--short-ratio", type=float, default=0.2, help="Ratio of messages under 5 characters"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the memory measurement")
+    parser.add_argument("-o", "--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args(arguments)
+    random.seed(args.seed)
+
+    if args.trace:
+        trace = read_trace(args.trace)
+    else:
+        trace = generate_trace(
+            args.guilds, args.hours, args.messages_per_hour, args.author_skew, args.short_ratio
+        )
+        if args.record:
+            write_trace(args.record, trace)
+    if not trace:
+        print("The trace is empty.")
+        return 1
+
+    messages = build_messages(trace)
+    del trace
+    results = asyncio.run(simulate(load_manager(args.manager), messages, not args.no_memory))
+    print_results(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,15 +1,18 @@
-import asyncio
 import logging
+import math
 import random
+import struct
+import sys
 from abc import abstractmethod
-from collections import deque, namedtuple
-from dataclasses import dataclass, field
-from datetime import datetime
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Literal
 
 import discord
 from discord.utils import format_dt
 
+from ballsdex.core.metrics import spawn_state_bytes, spawn_tracked_guilds
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -18,8 +21,23 @@ if TYPE_CHECKING:
 log = logging.getLogger("ballsdex.packages.countryballs")
 
 SPAWN_CHANCE_RANGE = (40, 55)
+# messages are counted at most once per this number of seconds in a guild
+COUNT_INTERVAL = 10
+
+# number of recent messages considered for the chatters penalties
+WINDOW_SIZE = 100
+# seconds between two sweeps of idle guilds
+SWEEP_INTERVAL = 60
+
+# binary format of the spawn state snapshots: a header (magic, version, window size, number of
+# guilds), then for each guild a fixed record followed by its recent messages, oldest first
+SNAPSHOT_MAGIC = b"BDSPAWN"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<7sHHI")
+# guild ID, time, scaled message count, last counted (NaN if None), last seen, threshold,
+# number of messages in the window
+SNAPSHOT_RECORD = struct.Struct("<QddddHB")
 
-CachedMessage = namedtuple("CachedMessage", ["content", "author_id"])
 
 class BaseSpawnManager:
     """
@@ -74,71 +92,224 @@ class BaseSpawnManager:
         """
         raise NotImplementedError
 
+    def snapshot(self) -> bytes | None:
+        """
+        Serialize the state of the manager, to be restored after a restart with `restore`.
+        Called periodically and when the cog is unloaded.
+
+        This is optional, the default implementation returns `None`, which saves nothing.
+
+        Returns
+        -------
+        bytes | None
+            The serialized state, or `None` if there is nothing to save.
+        """
+        return None
+
+    def restore(self, data: bytes):
+        """
+        Restore a state previously returned by `snapshot`. Called when the cog is loaded.
+
+        Parameters
+        ----------
+        data: bytes
+            The serialized state. It may have been written by another implementation or
+            version, raise `ValueError` if it cannot be read.
+        """
+        pass
+
 
-@dataclass
 class SpawnCooldown:
     """
     Represents the default spawn internal system per guild. Contains the counters that will
     determine if a countryball should be spawned next or not.
 
+    One instance exists per active guild, so the memory footprint is kept minimal: timestamps
+    are stored as floats, and the recent messages as a ring buffer of author IDs and flags.
+
     Attributes
     ----------
-    time: datetime
-        Time when the object was initialized. Block spawning when it's been less than ten minutes
+    time: float
+        Timestamp when the object was initialized. Block spawning when it's been less than ten
+        minutes
     scaled_message_count: float
         A number starting at 0, incrementing with the messages until reaching `threshold`. At this
         point, a ball will be spawned next.
     threshold: int
         The number `scaled_message_count` has to reach for spawn.
         Determined randomly with `SPAWN_CHANCE_RANGE`
-    lock: asyncio.Lock
-        Used to ratelimit messages and ignore fast spam
-    message_cache: ~collections.deque[CachedMessage]
-        A list of recent messages used to reduce the spawn chance when too few different chatters
-        are present. Limited to the 100 most recent messages in the guild.
+    last_counted: float | None
+        Timestamp of the last message counted, used to ratelimit messages and ignore fast
+        spam. `None` if no message was counted since the last spawn.
+    last_seen: float
+        Timestamp of the last message received, used to evict idle guilds
+    authors: array.array[int]
+        Ring buffer of the authors of the `WINDOW_SIZE` most recent messages, used to reduce the
+        spawn chance when too few different chatters are present
+    short_flags: bytearray
+        Ring buffer of the same messages, 1 if the message is shorter than 5 characters
+    head: int
+        Index of the next slot written in the ring buffers
+    length: int
+        Number of messages in the ring buffers
+    author_counts: dict[int, int]
+        Number of messages of each author in the ring buffer, kept up to date by `cache_message`
+    short_messages: int
+        Number of messages in the ring buffer shorter than 5 characters
     """
 
-    time: datetime
-    # initialize partially started, to reduce the dead time after starting the bot
-    scaled_message_count: float = field(default=SPAWN_CHANCE_RANGE[0] // 2)
-    threshold: int = field(default_factory=lambda: random.randint(*SPAWN_CHANCE_RANGE))
-    lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False)
-    message_cache: deque[CachedMessage] = field(default_factory=lambda: deque(maxlen=100))
+    __slots__ = (
+        "time",
+        "scaled_message_count",
+        "threshold",
+        "last_counted",
+        "last_seen",
+        "authors",
+        "short_flags",
+        "head",
+        "length",
+        "author_counts",
+        "short_messages",
+    )
+
+    def __init__(self, time: float):
+        self.time = time
+        # initialize partially started, to reduce the dead time after starting the bot
+        self.scaled_message_count: float = SPAWN_CHANCE_RANGE[0] // 2
+        self.threshold = random.randint(*SPAWN_CHANCE_RANGE)
+        self.last_counted: float | None = None
+        self.last_seen = time
+        self.authors = array("Q", bytes(8 * WINDOW_SIZE))
+        self.short_flags = bytearray(WINDOW_SIZE)
+        self.head = 0
+        self.length = 0
+        self.author_counts: dict[int, int] = {}
+        self.short_messages = 0
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate memory used by this object.
+        """
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.authors)
+            + sys.getsizeof(self.short_flags)
+            + sys.getsizeof(self.author_counts)
+        )
 
-    def reset(self, time: datetime):
+    def reset(self, time: float):
         self.scaled_message_count = 1.0
         self.threshold = random.randint(*SPAWN_CHANCE_RANGE)
-        try:
-            self.lock.release()
-        except RuntimeError:  # lock is not acquired
-            pass
+        self.last_counted = None
         self.time = time
 
-    async def increase(self, message: discord.Message) -> bool:
-        # this is a deque, not a list
-        # its property is that, once the max length is reached (100 for us),
-        # the oldest element is removed, thus we only have the last 100 messages in memory
-        self.message_cache.append(
-            CachedMessage(content=message.content, author_id=message.author.id)
+    def cache_message(self, author_id: int, short: bool):
+        """
+        Record a message in the ring buffer, updating the statistics for the message it replaces
+        once the buffer is full.
+        """
+        head = self.head
+        if self.length == WINDOW_SIZE:
+            evicted = self.authors[head]
+            count = self.author_counts[evicted] - 1
+            if count:
+                self.author_counts[evicted] = count
+            else:
+                del self.author_counts[evicted]
+            self.short_messages -= self.short_flags[head]
+        else:
+            self.length += 1
+        self.authors[head] = author_id
+        self.short_flags[head] = short
+        self.author_counts[author_id] = self.author_counts.get(author_id, 0) + 1
+        self.short_messages += short
+        self.head = (head + 1) % WINDOW_SIZE
+
+    def on_cooldown(self, now: float) -> bool:
+        """
+        Whether a message was counted less than `COUNT_INTERVAL` seconds before `now`.
+        """
+        return self.last_counted is not None and now - self.last_counted < COUNT_INTERVAL
+
+    def pack(self, guild_id: int) -> bytes:
+        """
+        Serialize this state for a snapshot, see `SNAPSHOT_RECORD`.
+        """
+        head, length = self.head, self.length
+        if length < WINDOW_SIZE:
+            authors, flags = self.authors[:length], self.short_flags[:length]
+        else:
+            authors = self.authors[head:] + self.authors[:head]
+            flags = self.short_flags[head:] + self.short_flags[:head]
+        return (
+            SNAPSHOT_RECORD.pack(
+                guild_id,
+                self.time,
+                self.scaled_message_count,
+                math.nan if self.last_counted is None else self.last_counted,
+                self.last_seen,
+                self.threshold,
+                length,
+            )
+            + authors.tobytes()
+            + flags
         )
 
-        if self.lock.locked():
-            return False
+    @classmethod
+    def unpack(cls, data: memoryview, offset: int) -> tuple[int, "SpawnCooldown", int]:
+        """
+        Read a state serialized with `pack`.
+
+        Returns
+        -------
+        tuple[int, SpawnCooldown, int]
+            The guild ID, the state, and the offset of the next record.
+        """
+        guild_id, time, count, last_counted, last_seen, threshold, length = (
+            SNAPSHOT_RECORD.unpack_from(data, offset)
+        )
+        offset += SNAPSHOT_RECORD.size
+        end = offset + 9 * length
+        if end > len(data):
+            raise ValueError("Truncated spawn state record")
+        cooldown = cls.__new__(cls)
+        cooldown.time = time
+        cooldown.scaled_message_count = count
+        cooldown.threshold = threshold
+        cooldown.last_counted = None if math.isnan(last_counted) else last_counted
+        cooldown.last_seen = last_seen
+        cooldown.authors = array("Q", data[offset : offset + 8 * length].tobytes())
+        cooldown.short_flags = bytearray(data[offset + 8 * length : end])
+        cooldown.author_counts = Counter(cooldown.authors)
+        cooldown.short_messages = cooldown.short_flags.count(1)
+        if length < WINDOW_SIZE:
+            cooldown.authors.extend(bytes(WINDOW_SIZE - length))
+            cooldown.short_flags.extend(bytes(WINDOW_SIZE - length))
+        cooldown.head = length % WINDOW_SIZE
+        cooldown.length = length
+        return guild_id, cooldown, end
 
-        async with self.lock:
-            message_multiplier = 1
-            if message.guild.member_count < 5 or message.guild.member_count > 1000:  # type: ignore
-                message_multiplier /= 2
-            if message._state.intents.message_content and len(message.content) < 5:
-                message_multiplier /= 2
-            if len(set(x.author_id for x in self.message_cache)) < 4 or (
-                len(list(filter(lambda x: x.author_id == message.author.id, self.message_cache)))
-                / self.message_cache.maxlen  # type: ignore
-                > 0.4
-            ):
-                message_multiplier /= 2
-            self.scaled_message_count += message_multiplier
-            await asyncio.sleep(10)
+    async def increase(self, message: discord.Message) -> bool:
+        now = message.created_at.timestamp()
+        self.last_seen = now
+        self.cache_message(message.author.id, len(message.content) < 5)
+
+        if self.on_cooldown(now):
+            return False
+        self.last_counted = now
+
+        message_multiplier = 1
+        if message.guild.member_count < 5 or message.guild.member_count > 1000:  # type: ignore
+            message_multiplier /= 2
+        if message._state.intents.message_content and len(message.content) < 5:
+            message_multiplier /= 2
+        if (
+            len(self.author_counts) < 4
+            or self.author_counts[message.author.id] / WINDOW_SIZE > 0.4
+        ):
+            message_multiplier /= 2
+        self.scaled_message_count += message_multiplier
         return True
 
 
@@ -146,18 +317,65 @@ class SpawnManager(BaseSpawnManager):
     def __init__(self, bot: "BallsDexBot"):
         super().__init__(bot)
         self.cooldowns: dict[int, SpawnCooldown] = {}
+        self.last_sweep = 0.0
+
+    def sweep(self, now: float):
+        """
+        Forget the guilds without messages for more than `settings.spawn_idle_ttl` seconds,
+        and update the metrics. Runs at most once per `SWEEP_INTERVAL`.
+        """
+        if now - self.last_sweep < SWEEP_INTERVAL:
+            return
+        self.last_sweep = now
+        ttl = settings.spawn_idle_ttl
+        if ttl > 0:
+            idle = [id for id, x in self.cooldowns.items() if now - x.last_seen > ttl]
+            for guild_id in idle:
+                del self.cooldowns[guild_id]
+            if idle:
+                log.debug(f"Evicted the spawn state of {len(idle)} idle guilds.")
+        spawn_tracked_guilds.set(len(self.cooldowns))
+        spawn_state_bytes.set(sum(x.nbytes for x in self.cooldowns.values()))
+
+    def snapshot(self) -> bytes:
+        header = SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, WINDOW_SIZE, len(self.cooldowns)
+        )
+        return header + b"".join(x.pack(id) for id, x in self.cooldowns.items())
+
+    def restore(self, data: bytes):
+        view = memoryview(data)
+        try:
+            magic, version, window_size, count = SNAPSHOT_HEADER.unpack_from(view)
+        except struct.error as e:
+            raise ValueError("Truncated spawn state snapshot") from e
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or window_size != WINDOW_SIZE:
+            raise ValueError(f"Unsupported spawn state snapshot (version {version})")
+
+        now = datetime.now(timezone.utc).timestamp()
+        ttl = settings.spawn_idle_ttl
+        offset = SNAPSHOT_HEADER.size
+        try:
+            for _ in range(count):
+                guild_id, cooldown, offset = SpawnCooldown.unpack(view, offset)
+                if ttl <= 0 or now - cooldown.last_seen <= ttl:
+                    self.cooldowns[guild_id] = cooldown
+        except (struct.error, ValueError) as e:
+            raise ValueError("Truncated spawn state snapshot") from e
 
     async def handle_message(self, message: discord.Message) -> bool:
         guild = message.guild
         if not guild:
             return False
 
+        now = message.created_at.timestamp()
+        self.sweep(now)
         cooldown = self.cooldowns.get(guild.id, None)
         if not cooldown:
-            cooldown = SpawnCooldown(message.created_at)
+            cooldown = SpawnCooldown(now)
             self.cooldowns[guild.id] = cooldown
 
-        delta_t = (message.created_at - cooldown.time).total_seconds()
+        delta_t = now - cooldown.time
         # change how the threshold varies according to the member count, while nuking farm servers
         if not guild.member_count:
             return False
@@ -184,7 +402,7 @@ class SpawnManager(BaseSpawnManager):
             return False
 
         # spawn countryball
-        cooldown.reset(message.created_at)
+        cooldown.reset(now)
         return True
 
     async def admin_explain(
@@ -208,7 +426,8 @@ class SpawnManager(BaseSpawnManager):
         embed.set_author(name=guild.name, icon_url=guild.icon.url if guild.icon else None)
         embed.colour = discord.Colour.orange()
 
-        delta = (interaction.created_at - cooldown.time).total_seconds()
+        now = interaction.created_at.timestamp()
+        delta = now - cooldown.time
         # change how the threshold varies according to the member count, while nuking farm servers
         if guild.member_count < 5:
             multiplier = 0.1
@@ -226,20 +445,12 @@ class SpawnManager(BaseSpawnManager):
         penalities: list[str] = []
         if guild.member_count < 5 or guild.member_count > 1000:
             penalities.append("Server has less than 5 or more than 1000 members")
-        if any(len(x.content) < 5 for x in cooldown.message_cache):
+        if cooldown.short_messages:
             penalities.append("Some cached messages are less than 5 characters long")
 
-        authors_set = set(x.author_id for x in cooldown.message_cache)
-        low_chatters = len(authors_set) < 4
+        low_chatters = len(cooldown.author_counts) < 4
         # check if one author has more than 40% of messages in cache
-        major_chatter = any(
-            (
-                len(list(filter(lambda x: x.author_id == author, cooldown.message_cache)))
-                / cooldown.message_cache.maxlen  # type: ignore
-                > 0.4
-            )
-            for author in authors_set
-        )
+        major_chatter = max(cooldown.author_counts.values(), default=0) / WINDOW_SIZE > 0.4
         # this mess is needed since either conditions make up to a single penality
         if low_chatters:
             if not major_chatter:
@@ -262,10 +473,11 @@ class SpawnManager(BaseSpawnManager):
 
         chance = cooldown.threshold - multiplier * (delta // 60)
 
+        initiated = datetime.fromtimestamp(cooldown.time, tz=timezone.utc)
         embed.description = (
-            f"Manager initiated **{format_dt(cooldown.time, style='R')}**\n"
+            f"Manager initiated **{format_dt(initiated, style='R')}**\n"
             f"Initial number of points to reach: **{cooldown.threshold}**\n"
-            f"Message cache length: **{len(cooldown.message_cache)}**\n\n"
+            f"Message cache length: **{cooldown.length}**\n\n"
             f"Time-based multiplier: **x{multiplier}** *({range} members)*\n"
             "*This affects how much the number of points to reach reduces over time*\n"
             f"Penality multiplier: **x{penality_multiplier}**\n"
@@ -274,7 +486,7 @@ class SpawnManager(BaseSpawnManager):
         )
 
         informations: list[str] = []
-        if cooldown.lock.locked():
+        if cooldown.on_cooldown(now):
             informations.append("The manager is currently on cooldown.")
         if delta < 600:
             informations.append(
@@ -0,0 +1,168 @@
+"""
+Live synchronization of the spawn channels cache with the database.
+
+A trigger on the `guildconfig` table (admin panel migration 0013) sends a notification on the
+`guildconfig_changes` channel for every change, whichever process made it. Each bot process
+listens to it on a dedicated connection and patches its cache of spawn channels.
+
+To check the notifications against a local database, run
+`python3 -m ballsdex.packages.countryballs.sync` with `BALLSDEXBOT_DB_URL` set, then edit a
+guild config from the admin panel or `psql`, each change is logged with the resulting spawn channel.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Iterator
+
+import asyncpg
+
+log = logging.getLogger("ballsdex.packages.countryballs.sync")
+
+CHANNEL = "guildconfig_changes"
+RECONNECT_DELAY = 10
+# interval of the queries checking that the connection is alive
+KEEPALIVE_INTERVAL = 60
+
+
+def apply_change(cache: dict[int, int], change: dict[str, Any]):
+    """
+    Patch the cache of spawn channels (guild ID to channel ID, for enabled guilds only) with a
+    change notification.
+    """
+    guild_id = change["guild_id"]
+    if change["op"] == "DELETE" or not change["enabled"] or change["spawn_channel"] is None:
+        cache.pop(guild_id, None)
+    else:
+        cache[guild_id] = change["spawn_channel"]
+
+
+class GuildConfigSync:
+    """
+    Listens to the changes of guild configs and applies them to a cache of spawn channels.
+
+    Notifications sent while the connection is lost cannot be recovered, so `on_reconnect` is
+    called after reconnecting to reload the cache.
+
+    Parameters
+    ----------
+    cache: dict[int, int]
+        The cache of spawn channels to patch, modified in place.
+    dsn: str
+        URL of the Postgres database.
+    on_reconnect: Callable[[], Awaitable[None]] | None
+        Coroutine function called after the connection was lost and established again.
+    """
+
+    def __init__(
+        self,
+        cache: dict[int, int],
+        dsn: str,
+        on_reconnect: Callable[[], Awaitable[None]] | None = None,
+    ):
+        self.cache = cache
+        self.dsn = dsn
+        self.on_reconnect = on_reconnect
+        self.connection: asyncpg.Connection | None = None
+        self.task: asyncio.Task | None = None
+        # changes recorded for each running `buffer_changes` block
+        self.buffers: list[list[dict[str, Any]]] = []
+
+    def on_notification(
+        self, connection: asyncpg.Connection, pid: int, channel: str, payload: str
+    ):
+        try:
+            change = json.loads(payload)
+            apply_change(self.cache, change)
+        except (ValueError, KeyError):
+            log.warning(f"Invalid guild config notification: {payload}")
+            return
+        log.debug(
+            f"Applied guild config change {payload}, "
+            f"spawn channel now {self.cache.get(change['guild_id'])}"
+        )
+        for buffer in self.buffers:
+            buffer.append(change)
+
+    @contextlib.contextmanager
+    def buffer_changes(self) -> Iterator[None]:
+        """
+        Apply again the changes received during the block once it exits. The cache must be
+        reloaded from the database inside this block, otherwise changes received while the
+        query runs are overwritten by its outdated results.
+        """
+        buffer: list[dict[str, Any]] = []
+        self.buffers.append(buffer)
+        try:
+            yield
+        finally:
+            self.buffers.remove(buffer)
+            for change in buffer:
+                apply_change(self.cache, change)
+
+    async def connect(self):
+        self.connection = await asyncpg.connect(self.dsn)
+        await self.connection.add_listener(CHANNEL, self.on_notification)
+
+    async def start(self):
+        """
+        Start listening. The first connection is awaited, so that changes made after this
+        returns are never missed.
+        """
+        await self.connect()
+        self.task = asyncio.create_task(self.run(), name="guildconfig-sync")
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        if self.connection and not self.connection.is_closed():
+            await self.connection.close()
+        self.connection = None
+
+    async def run(self):
+        while True:
+            try:
+                while self.connection and not self.connection.is_closed():
+                    await asyncio.sleep(KEEPALIVE_INTERVAL)
+                    await self.connection.execute("SELECT 1")
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                log.warning("Lost the guild config notifications connection", exc_info=True)
+            if self.connection:
+                self.connection.terminate()
+                self.connection = None
+
+            await asyncio.sleep(RECONNECT_DELAY)
+            try:
+                await self.connect()
+            except (OSError, asyncpg.PostgresError):
+                log.warning("Failed to reconnect to the guild config notifications")
+                continue
+            log.info("Reconnected to the guild config notifications")
+            if self.on_reconnect:
+                try:
+                    await self.on_reconnect()
+                except Exception:
+                    # the cache may have missed changes, connect again to retry the reload
+                    log.exception("Failed to reload the cache after reconnecting, retrying")
+                    if self.connection:
+                        self.connection.terminate()
+                    self.connection = None
+
+
+async def main():
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s %(levelname)s %(message)s")
+    sync = GuildConfigSync({}, os.environ["BALLSDEXBOT_DB_URL"])
+    await sync.start()
+    log.info(f"Listening to {CHANNEL}, press Ctrl+C to stop")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sync.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,7 +9,6 @@ from discord.utils import format_dt
 
 from ballsdex.settings import settings
 from ballsdex.core.utils.paginator import FieldPageSource, Pages
-from ballsdex.packages.countryballs.countryball import BallSpawnView
 from ballsdex.core.models import (
     Ball,
     BallInstance,
@@ -17,7 +16,8 @@ from ballsdex.core.models import (
     ItemsInstance, 
     ItemsBD,
     Special,
-    Player
+    Player,
+    player_cache,
 )
 from tortoise.expressions import Q
 from tortoise.timezone import now as datetime_now, get_default_timezone
@@ -44,7 +44,7 @@ class Economy(commands.GroupCog):
         Reclama monedas diarias.
         """
         await interaction.response.defer(thinking=True, ephemeral=True)
-        player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
 
         if await player.is_cooldowned():
             return await interaction.followup.send(
@@ -129,7 +129,7 @@ class Economy(commands.GroupCog):
         await interaction.response.defer(thinking=True, ephemeral=True)
 
         config, _ = await GuildConfig.get_or_create(guild_id=interaction.guild_id)
-        player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
 
         await config.fetch_related("items")
 
@@ -148,6 +148,7 @@ class Economy(commands.GroupCog):
             await interaction.followup.send("No puedes comprar este item porque su disponibilidad ha finalizado.")
             return
 
+        await player.refresh_money()
         if not player.can_afford(get_item.value):
             amount_required = get_item.value - player.money
             return await interaction.followup.send(
@@ -157,20 +158,24 @@ class Economy(commands.GroupCog):
         
         await get_item.fetch_related("ball", "special")
 
-        if get_item.ball is None and get_item.special is None:
+        # the balance may change between the check above and the payment
+        try:
             await player.remove_money(get_item.value)
+        except ValueError:
+            return await interaction.followup.send(
+                "No tienes la cantidad suficiente de fichas para pagar este item."
+            )
+
+        if get_item.ball is None and get_item.special is None:
             instance = await ItemsInstance.create(player=player, item=get_item)
 
             return await interaction.followup.send(f"Se ha añadido a tu inventario el item **{instance.item.name}**.")
         else:
-            await player.remove_money(get_item.value)
-
             ball: Ball | None = get_item.ball
             special: Special | None = get_item.special
 
             if ball is None:
-                cb = await BallSpawnView.get_random(self.bot)
-                ball = cb.model
+                ball = self.bot.ball_table.draw()
 
             bonus_attack = random.randint(-settings.max_attack_bonus, settings.max_attack_bonus)
             bonus_health = random.randint(-settings.max_health_bonus, settings.max_health_bonus)
@@ -196,7 +201,8 @@ class Economy(commands.GroupCog):
         Visualiza la cantidad de monedas que tienes en BallsDex
         """
         await interaction.response.defer(thinking=True, ephemeral=True)
-        player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
+        await player.refresh_money()
 
         return await interaction.followup.send(
             f"Tienes **<:hispanic_coin:1397336808890564748> {player.money:,}** monedas."
@@ -256,27 +262,25 @@ class Economy(commands.GroupCog):
             Cantidad de monedas a regalar.
         """
         await interaction.response.defer(thinking=True)
-        old_player, _ = await Player.get_or_create(discord_id=interaction.user.id)
-        new_player, _ = await Player.get_or_create(discord_id=user.id)
+        old_player, _ = await player_cache.get_or_create(interaction.user.id)
+        new_player, _ = await player_cache.get_or_create(user.id)
 
         if old_player.discord_id == new_player.discord_id:
             await interaction.followup.send("No puedes donarte a ti mismo.")
             return
 
-        if not old_player.can_afford(amount):
-            money = old_player.money
+        try:
+            await old_player.remove_money(amount)
+        except ValueError:
+            money = await old_player.refresh_money()
             await interaction.followup.send(
                 f"No tienes la cantidad suficiente para regalar esa "
                 "cantidad de monedas.\n"
                 f"Actualmente tienes **{money:,}** monedas."
             )
             return
-        
-        old_player.money -= amount
-        await old_player.save(update_fields=("money",))
 
-        new_player.money += amount
-        await new_player.save(update_fields=("money",))
+        await new_player.add_money(amount)
 
         return await interaction.followup.send(
             f"¡Le has regalado **<:hispanic_coin:1397336808890564748> {amount:,}** monedas a {user.mention}!",
@@ -289,7 +293,7 @@ class Economy(commands.GroupCog):
         Revisa tu inventario de items.
         """
         await interaction.response.defer(thinking=True, ephemeral=True)
-        player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
         
         await player.fetch_related("items")
         
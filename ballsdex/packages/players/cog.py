@@ -6,7 +6,6 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from discord.utils import format_dt
-from tortoise.exceptions import DoesNotExist
 from tortoise.expressions import Q
 
 from ballsdex.core.models import (
@@ -18,8 +17,16 @@ from ballsdex.core.models import (
     MentionPolicy,
 )
 from ballsdex.core.models import Player as PlayerModel
-from ballsdex.core.models import PrivacyPolicy, Trade, TradeCooldownPolicy, TradeObject, balls
+from ballsdex.core.models import (
+    PrivacyPolicy,
+    Trade,
+    TradeCooldownPolicy,
+    TradeObject,
+    balls,
+    player_cache,
+)
 from ballsdex.core.utils.buttons import ConfirmChoiceView
+from ballsdex.core.utils.completion import enabled_bitset, owned_balls
 from ballsdex.core.utils.enums import (
     DONATION_POLICY_MAP,
     FRIEND_POLICY_MAP,
@@ -71,14 +78,14 @@ class Player(commands.GroupCog):
         policy: PrivacyPolicy
             The new privacy policy to choose.
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
         if policy == PrivacyPolicy.SAME_SERVER and not self.bot.intents.members:
             await interaction.response.send_message(
                 "I need the `members` intent to use this policy.", ephemeral=True
             )
             return
         player.privacy_policy = PrivacyPolicy(policy.value)
-        await player.save()
+        await player.save(update_fields=("privacy_policy",))
         await interaction.response.send_message(
             f"Your privacy policy has been set to **{policy.name}**.", ephemeral=True
         )
@@ -107,7 +114,7 @@ class Player(commands.GroupCog):
         policy: DonationPolicy
             The new policy for accepting donations
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
         player.donation_policy = DonationPolicy(policy.value)
         if policy.value == DonationPolicy.ALWAYS_ACCEPT:
             await interaction.response.send_message(
@@ -137,7 +144,8 @@ class Player(commands.GroupCog):
         else:
             await interaction.response.send_message("Invalid input!", ephemeral=True)
             return
-        await player.save()  # do not save if the input is invalid
+        # do not save if the input is invalid
+        await player.save(update_fields=("donation_policy",))
 
     @policy.command()
     @app_commands.choices(
@@ -157,9 +165,9 @@ class Player(commands.GroupCog):
         policy: MentionPolicy
             The new policy for mentions
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
         player.mention_policy = policy
-        await player.save()
+        await player.save(update_fields=("mention_policy",))
         await interaction.response.send_message(
             f"Your mention policy has been set to **{policy.name.lower()}**.", ephemeral=True
         )
@@ -180,9 +188,9 @@ class Player(commands.GroupCog):
         policy: FriendPolicy
             The new policy for friend requests.
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
         player.friend_policy = policy
-        await player.save()
+        await player.save(update_fields=("friend_policy",))
         await interaction.response.send_message(
             f"Your friend request policy has been set to **{policy.name.lower()}**.",
             ephemeral=True,
@@ -208,9 +216,9 @@ class Player(commands.GroupCog):
         policy: TradeCooldownPolicy
             The new policy for trade acceptance cooldown.
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
         player.trade_cooldown_policy = policy
-        await player.save()
+        await player.save(update_fields=("trade_cooldown_policy",))
         await interaction.response.send_message(
             f"Your trade acceptance cooldown policy has been set to **{policy.name.lower()}**.",
             ephemeral=True,
@@ -228,7 +236,7 @@ class Player(commands.GroupCog):
         await view.wait()
         if view.value is None or not view.value:
             return
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
         await player.delete()
 
     @friend.command(name="add")
@@ -243,8 +251,8 @@ class Player(commands.GroupCog):
         user: discord.User
             The user you want to add as a friend.
         """
-        player1, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await PlayerModel.get_or_create(discord_id=user.id)
+        player1, _ = await player_cache.get_or_create(interaction.user.id)
+        player2, _ = await player_cache.get_or_create(user.id)
 
         if player1 == player2:
             await interaction.response.send_message(
@@ -336,8 +344,8 @@ class Player(commands.GroupCog):
         user: discord.User
             The user you want to remove as a friend.
         """
-        player1, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await PlayerModel.get_or_create(discord_id=user.id)
+        player1, _ = await player_cache.get_or_create(interaction.user.id)
+        player2, _ = await player_cache.get_or_create(user.id)
 
         if player1 == player2:
             await interaction.response.send_message("You cannot remove yourself.", ephemeral=True)
@@ -366,7 +374,7 @@ class Player(commands.GroupCog):
         """
         View all your friends.
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
 
         friendships = (
             await Friendship.filter(Q(player1=player) | Q(player2=player))
@@ -412,8 +420,8 @@ class Player(commands.GroupCog):
         user: discord.User
             The user you want to block.
         """
-        player1, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await PlayerModel.get_or_create(discord_id=user.id)
+        player1, _ = await player_cache.get_or_create(interaction.user.id)
+        player2, _ = await player_cache.get_or_create(user.id)
 
         await interaction.response.defer(ephemeral=True, thinking=True)
 
@@ -472,8 +480,8 @@ class Player(commands.GroupCog):
         user: discord.User
             The user you want to unblock.
         """
-        player1, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await PlayerModel.get_or_create(discord_id=user.id)
+        player1, _ = await player_cache.get_or_create(interaction.user.id)
+        player2, _ = await player_cache.get_or_create(user.id)
 
         if player1 == player2:
             await interaction.response.send_message("You cannot unblock yourself.", ephemeral=True)
@@ -498,7 +506,7 @@ class Player(commands.GroupCog):
         """
         View all the users you have blocked.
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player, _ = await player_cache.get_or_create(interaction.user.id)
 
         blocked_relations = (
             await Block.filter(player1=player)
@@ -544,11 +552,8 @@ class Player(commands.GroupCog):
         Display some of your info in the bot!
         """
         await interaction.response.defer(thinking=True, ephemeral=True)
-        try:
-            player = await PlayerModel.get(discord_id=interaction.user.id).prefetch_related(
-                "balls"
-            )
-        except DoesNotExist:
+        player = await player_cache.get_or_none(interaction.user.id)
+        if player is None:
             await interaction.followup.send("You haven't got any info to show!", ephemeral=True)
             return
         ball = await BallInstance.filter(player=player).prefetch_related("special", "trade_player")
@@ -556,17 +561,10 @@ class Player(commands.GroupCog):
         user = interaction.user
         bot_countryballs = {x: y.emoji_id for x, y in balls.items() if y.enabled}
         total_countryballs = len(bot_countryballs)
-        owned_countryballs = set(
-            x[0]
-            for x in await player.balls.filter(ball__enabled=True)
-            .distinct()
-            .values_list("ball_id")
-        )
+        owned_countryballs = (await owned_balls.get(player.pk) & enabled_bitset()).bit_count()
 
         if total_countryballs > 0:
-            completion_percentage = (
-                f"{round(len(owned_countryballs) / total_countryballs * 100, 1)}%"
-            )
+            completion_percentage = f"{round(owned_countryballs / total_countryballs * 100, 1)}%"
         else:
             completion_percentage = "0.0%"
 
@@ -627,7 +625,7 @@ class Player(commands.GroupCog):
         """
         Export your player data.
         """
-        player = await PlayerModel.get_or_none(discord_id=interaction.user.id)
+        player = await player_cache.get_or_none(interaction.user.id)
         if player is None:
             await interaction.response.send_message(
                 "You don't have any player data to export.", ephemeral=True
@@ -12,6 +12,7 @@ from discord.utils import format_dt, utcnow
 from ballsdex.core.models import BallInstance, Player, Trade, TradeCooldownPolicy, TradeObject
 from ballsdex.core.utils import menus
 from ballsdex.core.utils.buttons import ConfirmChoiceView
+from ballsdex.core.utils.completion import owned_balls
 from ballsdex.core.utils.paginator import Pages
 from ballsdex.packages.balls.countryballs_paginator import CountryballsViewer
 from ballsdex.packages.trade.display import fill_trade_embed_fields
@@ -378,6 +379,8 @@ class TradeMenu:
         for countryball in valid_transferable_countryballs:
             await countryball.unlock()
             await countryball.save()
+        owned_balls.discard(self.trader1.player.pk)
+        owned_balls.discard(self.trader2.player.pk)
 
     async def confirm(self, trader: TradingUser) -> bool:
         """
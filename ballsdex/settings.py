@@ -62,12 +62,51 @@ class Settings:
         List of packages the bot will load upon startup
     spawn_manager: str
         Python path to a class implementing `BaseSpawnManager`, handling cooldowns and anti-cheat
+    spawn_idle_ttl: int
+        Seconds without messages after which the spawn state of a guild is forgotten, 0 to keep
+        it forever
+    spawn_state_path: str | None
+        File where the state of the spawn manager is saved to survive restarts, `None` to disable
+    spawn_dispatch_workers: int
+        Number of tasks sending spawn messages concurrently
+    spawn_dispatch_queue_size: int
+        Maximum number of spawns waiting to be sent, further spawns are dropped
+    spawn_dispatch_channel_interval: float
+        Minimum number of seconds between two spawns sent in the same channel
     webhook_url: str | None
         URL of a Discord webhook for admin notifications
     client_id: str
         ID of the Discord application
     client_secret: str
         Secret key of the Discord application (not the bot token)
+    render_cache_path: str | None
+        Directory where rendered cards are cached on disk, `None` to disable
+    render_cache_max_size: int
+        Maximum size of the rendered cards cache, in megabytes
+    render_asset_cache_size: int
+        Memory budget for decoded card assets of each rendering process, in megabytes
+    render_workers: int
+        Number of processes rendering cards, 0 to render in a thread of the bot process
+    render_queue_size: int
+        Maximum number of cards waiting to be rendered before replying that the renderer is busy
+    render_format: str
+        Image format of the cards, one of WEBP, JPEG, AVIF or PNG
+    render_quality: int
+        Encoding quality of the cards, from 0 to 100
+    render_method: int
+        WEBP compression method, from 0 (fastest) to 6 (smallest files)
+    render_lossless: bool
+        Use lossless WEBP compression
+    render_thumbnail_width: int
+        Width of the reduced cards shown when browsing a collection
+    render_spawn_max_size: int
+        Spawn images larger than this many kilobytes are compressed again, 0 to disable
+    render_spawn_format: str
+        Image format of the compressed spawn images, one of WEBP, JPEG or PNG
+    render_reuse_uploads: bool
+        Reference previously uploaded cards by their URL instead of uploading them again
+    render_reuse_spawn_uploads: bool
+        Same for spawn images, which lets players recognize a countryball by its URL
     """
 
     bot_token: str = ""
@@ -111,6 +150,11 @@ class Settings:
     prometheus_port: int = 15260
 
     spawn_manager: str = "ballsdex.packages.countryballs.spawn.SpawnManager"
+    spawn_idle_ttl: int = 86400
+    spawn_state_path: str | None = "./spawn-state.bin"
+    spawn_dispatch_workers: int = 4
+    spawn_dispatch_queue_size: int = 1000
+    spawn_dispatch_channel_interval: float = 1.0
 
     # django admin panel
     webhook_url: str | None = None
@@ -118,6 +162,22 @@ class Settings:
     client_id: str = ""
     client_secret: str = ""
 
+    # card rendering
+    render_cache_path: str | None = "./render-cache"
+    render_cache_max_size: int = 512
+    render_asset_cache_size: int = 256
+    render_workers: int = 2
+    render_queue_size: int = 32
+    render_format: str = "WEBP"
+    render_quality: int = 80
+    render_method: int = 4
+    render_lossless: bool = False
+    render_thumbnail_width: int = 500
+    render_spawn_max_size: int = 0
+    render_spawn_format: str = "WEBP"
+    render_reuse_uploads: bool = True
+    render_reuse_spawn_uploads: bool = False
+
     # sentry details
     sentry_dsn: str = ""
     sentry_environment: str = "production"
@@ -183,6 +243,12 @@ def read_settings(path: "Path"):
     settings.spawn_manager = content.get(
         "spawn-manager", "ballsdex.packages.countryballs.spawn.SpawnManager"
     )
+    settings.spawn_idle_ttl = content.get("spawn-idle-ttl", 86400)
+    settings.spawn_state_path = content.get("spawn-state-path", "./spawn-state.bin")
+    if spawn_dispatch := content.get("spawn-dispatch"):
+        settings.spawn_dispatch_workers = spawn_dispatch.get("workers", 4)
+        settings.spawn_dispatch_queue_size = spawn_dispatch.get("queue-size", 1000)
+        settings.spawn_dispatch_channel_interval = spawn_dispatch.get("channel-interval", 1.0)
 
     if admin := content.get("admin-panel"):
         settings.webhook_url = admin.get("webhook-url")
@@ -190,6 +256,22 @@ def read_settings(path: "Path"):
         settings.client_secret = admin.get("client-secret")
         settings.admin_url = admin.get("url")
 
+    if render := content.get("render"):
+        settings.render_cache_path = render.get("cache-path")
+        settings.render_cache_max_size = render.get("cache-max-size", 512)
+        settings.render_asset_cache_size = render.get("asset-cache-size", 256)
+        settings.render_workers = render.get("workers", 2)
+        settings.render_queue_size = render.get("queue-size", 32)
+        settings.render_format = render.get("format", "WEBP").upper()
+        settings.render_quality = render.get("quality", 80)
+        settings.render_method = render.get("method", 4)
+        settings.render_lossless = render.get("lossless", False)
+        settings.render_thumbnail_width = render.get("thumbnail-width", 500)
+        settings.render_spawn_max_size = render.get("spawn-max-size", 0)
+        settings.render_spawn_format = render.get("spawn-format", "WEBP").upper()
+        settings.render_reuse_uploads = render.get("reuse-uploads", True)
+        settings.render_reuse_spawn_uploads = render.get("reuse-spawn-uploads", False)
+
     if sentry := content.get("sentry"):
         settings.sentry_dsn = sentry.get("dsn")
         settings.sentry_environment = sentry.get("environment")
@@ -325,6 +407,61 @@ prometheus:
 
 spawn-manager: ballsdex.packages.countryballs.spawn.SpawnManager
 
+# seconds without messages after which the spawn progress of a server is forgotten to save
+# memory, 0 to keep it forever
+spawn-idle-ttl: 86400
+
+# file where the spawn progress of servers is saved to survive restarts, leave empty to disable
+spawn-state-path: ./spawn-state.bin
+
+# sending of spawn messages, done in the background to keep processing messages during bursts
+spawn-dispatch:
+  # number of spawn messages sent concurrently
+  workers: 4
+  # maximum number of spawns waiting to be sent, further spawns are dropped
+  queue-size: 1000
+  # minimum number of seconds between two spawns in the same channel
+  channel-interval: 1.0
+
+# card rendering settings
+render:
+  # directory where rendered cards are cached, leave empty to disable the cache
+  cache-path: ./render-cache
+
+  # maximum size of the cache in megabytes, least recently used cards are removed first
+  cache-max-size: 512
+
+  # memory used by decoded backgrounds, artworks and icons in each rendering process, in megabytes
+  asset-cache-size: 256
+
+  # number of processes rendering cards, set to 0 to render inside the bot process
+  workers: 2
+
+  # maximum number of cards waiting for a free process, further requests are rejected
+  queue-size: 32
+
+  # image format of the cards: WEBP, JPEG, AVIF or PNG
+  format: WEBP
+
+  # encoding quality from 0 to 100, and WEBP compression method from 0 (fast) to 6 (small)
+  quality: 80
+  method: 4
+  lossless: false
+
+  # width of the reduced cards shown when browsing a collection (full cards are 1500px wide)
+  thumbnail-width: 500
+
+  # spawn images larger than this many kilobytes are compressed again to fit, 0 to disable
+  spawn-max-size: 0
+  # image format of the compressed spawn images: WEBP, JPEG or PNG
+  spawn-format: WEBP
+
+  # send cards already uploaded once as a link to the existing attachment instead of uploading
+  # the same file again
+  reuse-uploads: true
+  # same for spawn images, but this lets players recognize a countryball from its link
+  reuse-spawn-uploads: false
+
 # sentry details, leave empty if you don't know what this is
 # https://sentry.io/ for error tracking
 sentry:
@@ -371,8 +508,12 @@ def update_settings(path: "Path"):
     add_plural_collectible = "plural-collectible-name" not in content
     add_packages = "packages:" not in content
     add_spawn_manager = "spawn-manager" not in content
+    add_spawn_idle_ttl = "spawn-idle-ttl" not in content
+    add_spawn_state_path = "spawn-state-path" not in content
+    add_spawn_dispatch = "spawn-dispatch:" not in content
     add_django = "Admin panel related settings" not in content
     add_sentry = "sentry:" not in content
+    add_render = "render:" not in content
     add_catch_messages = "catch:" not in content
 
     for line in content.splitlines():
@@ -441,6 +582,31 @@ packages:
 spawn-manager: ballsdex.packages.countryballs.spawn.SpawnManager
 """
 
+    if add_spawn_idle_ttl:
+        content += """
+# seconds without messages after which the spawn progress of a server is forgotten to save
+# memory, 0 to keep it forever
+spawn-idle-ttl: 86400
+"""
+
+    if add_spawn_state_path:
+        content += """
+# file where the spawn progress of servers is saved to survive restarts, leave empty to disable
+spawn-state-path: ./spawn-state.bin
+"""
+
+    if add_spawn_dispatch:
+        content += """
+# sending of spawn messages, done in the background to keep processing messages during bursts
+spawn-dispatch:
+  # number of spawn messages sent concurrently
+  workers: 4
+  # maximum number of spawns waiting to be sent, further spawns are dropped
+  queue-size: 1000
+  # minimum number of seconds between two spawns in the same channel
+  channel-interval: 1.0
+"""
+
     if add_django:
         content += """
 # Admin panel related settings
@@ -470,6 +636,48 @@ sentry:
     environment: "production"
 """
 
+    if add_render:
+        content += """
+# card rendering settings
+render:
+  # directory where rendered cards are cached, leave empty to disable the cache
+  cache-path: ./render-cache
+
+  # maximum size of the cache in megabytes, least recently used cards are removed first
+  cache-max-size: 512
+
+  # memory used by decoded backgrounds, artworks and icons in each rendering process, in megabytes
+  asset-cache-size: 256
+
+  # number of processes rendering cards, set to 0 to render inside the bot process
+  workers: 2
+
+  # maximum number of cards waiting for a free process, further requests are rejected
+  queue-size: 32
+
+  # image format of the cards: WEBP, JPEG, AVIF or PNG
+  format: WEBP
+
+  # encoding quality from 0 to 100, and WEBP compression method from 0 (fast) to 6 (small)
+  quality: 80
+  method: 4
+  lossless: false
+
+  # width of the reduced cards shown when browsing a collection (full cards are 1500px wide)
+  thumbnail-width: 500
+
+  # spawn images larger than this many kilobytes are compressed again to fit, 0 to disable
+  spawn-max-size: 0
+  # image format of the compressed spawn images: WEBP, JPEG or PNG
+  spawn-format: WEBP
+
+  # send cards already uploaded once as a link to the existing attachment instead of uploading
+  # the same file again
+  reuse-uploads: true
+  # same for spawn images, but this lets players recognize a countryball from its link
+  reuse-spawn-uploads: false
+"""
+
     if add_catch_messages:
         content += """
 catch:
@@ -509,8 +717,12 @@ catch:
             add_plural_collectible,
             add_packages,
             add_spawn_manager,
+            add_spawn_idle_ttl,
+            add_spawn_state_path,
+            add_spawn_dispatch,
             add_django,
             add_sentry,
+            add_render,
             add_catch_messages,
         )
     ):